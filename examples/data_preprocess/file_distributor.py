@@ -43,6 +43,7 @@ Example directory structure:
 import argparse
 
 from fttracer.tools.data_preprocess.file_distributor import file_distribution
+from fttracer.tools.data_preprocess.file_ops import LINK_MODES
 
 
 def main():
@@ -78,6 +79,18 @@ def main():
         default=".jpg",
         help="File extension to look for in image files (default: .jpg)",
     )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=None,
+        help="Number of threads used to copy files (default: thread pool default)",
+    )
+    parser.add_argument(
+        "--link_mode",
+        choices=LINK_MODES,
+        default="copy",
+        help="How to place files in the shells: byte copy, hardlink, or reflink (default: copy)",
+    )
 
     args = parser.parse_args()
 
@@ -86,6 +99,8 @@ def main():
         num_servers=args.num_servers,
         num_shells_per_server=args.num_shells_per_server,
         image_extension=args.image_extension,
+        max_workers=args.max_workers,
+        link_mode=args.link_mode,
     )
 
 
@@ -1,9 +1,24 @@
+import argparse
+
 from fttracer.tools.data_preprocess.image_eval_refactor import *
 
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(
+        description="Add book_id and image_id to the image evaluation results"
+    )
+    parser.add_argument(
+        "--output_format",
+        choices=OUTPUT_FORMATS,
+        default="json",
+        help="json: one file per image; jsonl: one file per book with one image per line (default: json)",
+    )
+    args = parser.parse_args()
+
     input_dir = r"F:\AgenticFin_Lab\fttracer\data_colection_and_processing\processed_report\images_eval"
     output_dir_yes = r"F:\AgenticFin_Lab\fttracer\data_colection_and_processing\processed_report\images_eval_refactor_yes"
     output_dir_no = r"F:\AgenticFin_Lab\fttracer\data_colection_and_processing\processed_report\images_eval_refactor_no"
 
-    process_json_files(input_dir, output_dir_yes, output_dir_no)
+    process_json_files(
+        input_dir, output_dir_yes, output_dir_no, output_format=args.output_format
+    )
@@ -71,6 +71,12 @@ def main():
         action="store_true",
         help="Whether to print detailed statistics (default: False)",
     )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=None,
+        help="Number of processes used to parse JSON files (default: CPU count)",
+    )
 
     args = parser.parse_args()
 
@@ -88,6 +94,7 @@ def main():
         keep_chart_types=chart_types_set,
         sampling_limit_per_theme=args.sampling_limit_per_theme,
         show_stats=args.show_stats,
+        max_workers=args.max_workers,
     )
 
     copy_selected_files(
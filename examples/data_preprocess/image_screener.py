@@ -20,10 +20,23 @@ def main():
         default="reorganized_results",
         help="Directory containing the reorganized files (default: reorganized_results)",
     )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=8,
+        help="Maximum number of concurrent API requests (default: 8)",
+    )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Send every image to the model instead of reusing cached responses from previous runs",
+    )
 
     args = parser.parse_args()
     screen_image(
         input_dir=args.input_dir,
+        max_workers=args.max_workers,
+        use_cache=not args.no_cache,
     )
 
 
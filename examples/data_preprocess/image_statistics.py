@@ -26,11 +26,18 @@ def main():
         default="image_statistics_summary.txt",
         help="Output file to save the statistics summary (default: image_statistics_summary.txt)",
     )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=None,
+        help="Number of threads used to read JSON files (default: executor's default)",
+    )
 
     args = parser.parse_args()
     analyze_image_statistics(
         base_dir=args.base_dir,
         output_file=args.output_file,
+        max_workers=args.max_workers,
     )
 
 
@@ -35,6 +35,23 @@ def main():
         default=1,
         help="Minimum file size to retain (default: 1MB).",
     )
+    parser.add_argument(
+        "--max_workers",
+        "-w",
+        type=int,
+        default=8,
+        help="Maximum number of classification requests in flight at once (default: 8).",
+    )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Classify every title with the API instead of reusing results from previous runs.",
+    )
+    parser.add_argument(
+        "--no_keyword_rules",
+        action="store_true",
+        help="Send every title to the API instead of classifying titles with obvious keywords locally.",
+    )
 
     args = parser.parse_args()
 
@@ -45,6 +62,9 @@ def main():
         auto_cleanup=args.auto_cleanup,
         size_threshold=args.size_threshold,
         prompt=prompt,
+        max_workers=args.max_workers,
+        use_cache=not args.no_cache,
+        use_keyword_rules=not args.no_keyword_rules,
     )
 
 
@@ -0,0 +1,84 @@
+"""On-disk cache of values extracted from per-image JSON files.
+
+Preprocessing scripts are re-run many times over mostly unchanged inputs.
+This cache stores the extracted fields of each JSON file keyed by its path,
+together with the file's mtime and size, so unchanged files are not opened
+and parsed again on the next run. Entries for files that were not seen in
+the current run are dropped when the manifest is saved.
+"""
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+from fttracer.tools.data_preprocess.json_io import dump_json, load_json
+
+# Bump when the layout of cached entries changes
+MANIFEST_VERSION = 1
+
+
+class ExtractionCache:
+    """Manifest of extraction results keyed by (path, mtime, size)."""
+
+    def __init__(self, manifest_path: str):
+        """Loads an existing manifest if one is present.
+
+        Args:
+            manifest_path: Path of the manifest file. The file should not end in
+                ".json" so directory scans for input JSON files ignore it.
+        """
+        self.manifest_path = manifest_path
+        self._entries: Dict[str, list] = {}
+        self._seen: Dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            manifest = load_json(manifest_path)
+            if manifest.get("version") == MANIFEST_VERSION:
+                self._entries = manifest["entries"]
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Ignoring unreadable cache manifest {manifest_path}: {e}")
+
+    def get(self, file_path: str) -> Tuple[bool, Optional[Any]]:
+        """Looks up the cached value for a file.
+
+        Args:
+            file_path: Path of the source JSON file.
+
+        Returns:
+            Tuple of (hit, value). value is None on a miss.
+        """
+        st = os.stat(file_path)
+        entry = self._entries.get(file_path)
+        if entry is not None and entry[0] == st.st_mtime_ns and entry[1] == st.st_size:
+            self._seen[file_path] = entry
+            self.hits += 1
+            return True, entry[2]
+        self._seen[file_path] = [st.st_mtime_ns, st.st_size, None]
+        self.misses += 1
+        return False, None
+
+    def put(self, file_path: str, value: Any) -> None:
+        """Stores the value extracted from a file looked up with get().
+
+        Args:
+            file_path: Path of the source JSON file.
+            value: JSON-serializable extraction result.
+        """
+        entry = self._seen.get(file_path)
+        if entry is None:
+            st = os.stat(file_path)
+            entry = self._seen[file_path] = [st.st_mtime_ns, st.st_size, None]
+        entry[2] = value
+
+    def save(self) -> None:
+        """Writes the entries seen in this run back to the manifest."""
+        entries = {path: e for path, e in self._seen.items() if e[2] is not None}
+        os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+        dump_json(
+            {"version": MANIFEST_VERSION, "entries": entries},
+            self.manifest_path,
+            indent=False,
+        )
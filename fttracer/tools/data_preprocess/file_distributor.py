@@ -7,11 +7,15 @@ for better data management and potential parallel processing scenarios.
 """
 
 import os
-import shutil
-import glob
 from pathlib import Path
 from socket import IPV6_UNICAST_HOPS
 
+from fttracer.tools.data_preprocess.file_ops import (
+    LINK_MODES,
+    iter_relative_files,
+    transfer_files,
+)
+
 
 def create_directory_structure(
     data_folder_root, num_servers=25, num_shells_per_server=20
@@ -55,7 +59,10 @@ def get_all_image_context_pairs(images_root, context_root, image_extension=".jpg
 
     This function walks through the images_root directory to find all image files,
     then attempts to find corresponding context files in the same relative path
-    within the context_root directory.
+    within the context_root directory. The context files are indexed with one
+    walk of context_root up front, so each image is matched with a set lookup
+    instead of a stat call. The walks also count the image and context
+    files, so callers need no separate scans to report the totals.
 
     Args:
         images_root (str or Path): Root directory containing image files
@@ -63,57 +70,88 @@ def get_all_image_context_pairs(images_root, context_root, image_extension=".jpg
         image_extension (str): File extension for image files (default: ".jpg")
 
     Returns:
-        List[dict]: List of dictionaries containing paths to matched image-context pairs
-                   Each dictionary has keys: "image", "context", "rel_path"
+        Tuple[List[dict], int, int]: The matched image-context pairs, the total
+            number of image files and the total number of context files.
+            Each pair dictionary has keys: "image", "context", "rel_path",
+            "rel_dir" (folder of rel_path) and "json_name" (context file name)
     """
     pairs = []
     missing_count = 0  # Track number of missing file pairs
-
-    # Walk through all image files in the images_root directory
-    for root, dirs, files in os.walk(images_root):
-        for file in files:
-            if file.lower().endswith(image_extension.lower()):
-                # Build relative path from images_root to maintain folder structure
-                rel_path = os.path.relpath(root, images_root)
-                image_path = os.path.join(root, file)
-
-                # Construct corresponding context file path
-                json_file = os.path.splitext(file)[0] + ".json"
-                context_path = os.path.join(context_root, rel_path, json_file)
-
-                # Check if corresponding context file exists
-                if os.path.exists(context_path):
-                    pairs.append(
-                        {
-                            "image": image_path,  # Full path to image file
-                            "context": context_path,  # Full path to context file
-                            "rel_path": os.path.join(
-                                rel_path, file
-                            ),  # Relative path including filename
-                        }
-                    )
-                else:
-                    # Output information about missing context files for debugging
-                    print(f"Missing context file: {image_path}")
-                    print(f"Expected context path: {context_path}")
-                    print("-" * 50)
-                    missing_count += 1
+    image_count = 0  # Track number of image files found
+
+    # Index the relative paths of all context files in one walk
+    context_files = {
+        os.path.join(rel_dir, name)
+        for rel_dir, name, _ in iter_relative_files(context_root, ".json")
+    }
+
+    # Walk through all image files in the images_root directory; os.scandir
+    # provides file types from the directory listing without extra stat calls
+    for rel_path, file, image_path in iter_relative_files(
+        images_root, image_extension.lower(), ignore_case=True
+    ):
+        image_count += 1
+
+        # Construct corresponding context file path in the same relative folder
+        json_file = os.path.splitext(file)[0] + ".json"
+        rel_json = os.path.join(rel_path, json_file)
+        context_path = os.path.join(context_root, rel_json)
+
+        # Check if corresponding context file exists
+        if rel_json in context_files:
+            pairs.append(
+                {
+                    "image": image_path,  # Full path to image file
+                    "context": context_path,  # Full path to context file
+                    "rel_path": os.path.join(
+                        rel_path, file
+                    ),  # Relative path including filename
+                    "rel_dir": rel_path,  # Relative folder of the pair
+                    "json_name": json_file,  # File name of the context file
+                }
+            )
+        else:
+            # Output information about missing context files for debugging
+            print(f"Missing context file: {image_path}")
+            print(f"Expected context path: {context_path}")
+            print("-" * 50)
+            missing_count += 1
 
     print(f"Found {len(pairs)} file pairs, missing {missing_count} pairs")
-    return pairs
+    return pairs, image_count, len(context_files)
 
 
-def distribute_files(pairs, data_folder, num_servers=25, num_shells_per_server=20):
-    """Distribute file pairs evenly across all data_shell folders using round-robin distribution.
+def distribute_files(
+    pairs,
+    data_folder,
+    num_servers=25,
+    num_shells_per_server=20,
+    max_workers=None,
+    link_mode="copy",
+):
+    """Distribute file pairs evenly across all data_shell folders in contiguous blocks.
 
     This function distributes the collected image-context pairs across the created
-    directory structure in a round-robin fashion to ensure even distribution.
+    directory structure to ensure even distribution. Pairs are sorted by image
+    path and each shell receives a contiguous block of them, so the sources of
+    one shell are read in directory order rather than scattered across the
+    whole tree.
+    The copies are planned first and then run on a thread pool, so several
+    files are in flight at once instead of the disk waiting on each in turn.
 
     Args:
-        pairs (list): List of image-context file pairs to distribute
+        pairs (list): List of image-context file pairs to distribute, as
+            returned by get_all_image_context_pairs
         data_folder (str or Path): Root directory of the target structure
         num_servers (int): Number of server folders (should match create_directory_structure)
         num_shells_per_server (int): Number of shells per server (should match create_directory_structure)
+        max_workers (int): Number of threads used to copy files (default: thread pool default)
+        link_mode (str): How to place files in the shells: "copy", "hardlink" or
+            "reflink". Links avoid copying any bytes when the target is on the
+            same filesystem and fall back to a copy otherwise (default: "copy")
+            A hardlinked shell file is the same file as its source: deleting
+            it leaves the source intact, but editing it in place edits the
+            source, so hardlinks suit shells that are only read
     """
     total_shells = num_servers * num_shells_per_server  # Total number of target folders
     print(f"Distributing {len(pairs)} file pairs across {total_shells} folders")
@@ -125,49 +163,77 @@ def distribute_files(pairs, data_folder, num_servers=25, num_shells_per_server=2
         f"Approximately {files_per_shell} files per shell, with {remainder} extra files distributed to first shells"
     )
 
-    # Distribute files using round-robin approach
-    for idx, pair in enumerate(pairs):
-        # Calculate target shell index using modulo operation for round-robin distribution
-        shell_idx = idx % total_shells
+    # Build the images and context directories of every shell once, instead
+    # of formatting names and joining paths for every pair
+    shell_image_dirs = []
+    shell_context_dirs = []
+    for shell_idx in range(total_shells):
         server_num = shell_idx // num_shells_per_server + 1  # Server number (1-indexed)
         shell_num = (
             shell_idx % num_shells_per_server + 1
         )  # Shell number within server (1-indexed)
 
-        server_name = f"data_server_{server_num:03d}"
-        shell_name = f"data_shell_{shell_num:03d}"
-
-        # Define target base path for this file pair
-        target_base = Path(data_folder) / server_name / shell_name
-
-        # Copy image file to target location, preserving relative directory structure
-        target_image_dir = target_base / "images"
-        rel_dir = os.path.dirname(pair["rel_path"])  # Extract relative directory path
-        (target_image_dir / rel_dir).mkdir(
-            parents=True, exist_ok=True
-        )  # Create necessary subdirectories
+        # Define target base path for this shell
+        target_base = (
+            Path(data_folder)
+            / f"data_server_{server_num:03d}"
+            / f"data_shell_{shell_num:03d}"
+        )
+        shell_image_dirs.append(target_base / "images")
+        shell_context_dirs.append(target_base / "context")
+
+    # The first `remainder` shells take one pair more than the others
+    large_block = files_per_shell + 1
+    large_blocks_end = remainder * large_block  # Index after the larger blocks
+
+    # Plan the copies in contiguous blocks; each pair adds its image and then
+    # its context file
+    copy_plan = []
+    target_dirs = set()  # Directories the planned copies go into
+    for idx, pair in enumerate(sorted(pairs, key=lambda pair: pair["image"])):
+        # Calculate target shell index from the block the pair falls into
+        if idx < large_blocks_end:
+            shell_idx = idx // large_block
+        else:
+            shell_idx = remainder + (idx - large_blocks_end) // files_per_shell
+
+        # Plan image copy to target location, preserving relative directory structure
+        target_image_dir = shell_image_dirs[shell_idx]
+        rel_dir = pair["rel_dir"]  # Relative directory path
+        target_dirs.add(target_image_dir / rel_dir)  # Created after planning
         target_image_path = (
             target_image_dir / pair["rel_path"]
         )  # Full target path for image
-        shutil.copy2(pair["image"], target_image_path)  # Copy with metadata
-
-        # Copy context file to target location, preserving relative directory structure
-        target_context_dir = target_base / "context"
-        (target_context_dir / rel_dir).mkdir(
-            parents=True, exist_ok=True
-        )  # Create necessary subdirectories
-        context_filename = (
-            os.path.splitext(os.path.basename(pair["rel_path"]))[0] + ".json"
-        )  # Extract filename without extension and add .json
+        copy_plan.append((pair["image"], target_image_path))
+
+        # Plan context copy to target location, preserving relative directory structure
+        target_context_dir = shell_context_dirs[shell_idx]
+        target_dirs.add(target_context_dir / rel_dir)  # Created after planning
         target_context_path = (
-            target_context_dir / rel_dir / context_filename
+            target_context_dir / rel_dir / pair["json_name"]
         )  # Full target path for context
-        shutil.copy2(pair["context"], target_context_path)  # Copy with metadata
-
-        # Progress indicator every 1000 files processed
-        if (idx + 1) % 1000 == 0:
-            print(f"Processed {idx + 1} file pairs")
-
+        copy_plan.append((pair["context"], target_context_path))
+
+    # Create each target directory once before any copy starts; sorting puts
+    # parents before their children, so each mkdir creates a single level
+    for target_dir in sorted(target_dirs):
+        target_dir.mkdir(parents=True, exist_ok=True)
+
+    # Run the copies concurrently; copy_plan holds two files per pair
+    failed_count = 0
+    for idx, (src, _, error) in enumerate(
+        transfer_files(copy_plan, link_mode, max_workers)
+    ):
+        if error is not None:
+            print(f"Failed to copy {src}: {error}")
+            failed_count += 1
+
+        # Progress indicator every 1000 file pairs (2000 copies) processed
+        if (idx + 1) % 2000 == 0:
+            print(f"Processed {(idx + 1) // 2} file pairs")
+
+    if failed_count:
+        print(f"Failed to copy {failed_count} files")
     print(
         f"Successfully distributed {len(pairs)} file pairs across {total_shells} shells"
     )
@@ -178,6 +244,8 @@ def file_distribution(
     num_servers=25,
     num_shells_per_server=20,
     image_extension=".jpg",
+    max_workers=None,
+    link_mode="copy",
 ):
     """Main function to execute the file distribution process with configurable parameters.
 
@@ -188,8 +256,14 @@ def file_distribution(
         num_servers (int): Number of server folders to create in the structure
         num_shells_per_server (int): Number of shell folders per server
         image_extension (str): File extension to look for in image files (e.g., ".jpg", ".png")
+        max_workers (int): Number of threads used to copy files (default: thread pool default)
+        link_mode (str): How to place files in the shells: "copy", "hardlink" or "reflink"
     """
 
+    # Reject an unknown link mode before creating any directories
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unsupported link mode: {link_mode}")
+
     # Construct paths for input directories
     images_root = os.path.join(input_dir, "images")
     context_root = os.path.join(input_dir, "context_summary_LLM")
@@ -204,18 +278,6 @@ def file_distribution(
         f"Structure: {num_servers} servers * {num_shells_per_server} shells per server"
     )
 
-    # Count total image files for information
-    image_files = list(
-        glob.glob(os.path.join(images_root, f"**/*{image_extension}"), recursive=True)
-    )
-    print(f"Total {image_extension} files found: {len(image_files)}")
-
-    # Count total context files for information
-    context_files = list(
-        glob.glob(os.path.join(context_root, "**/*.json"), recursive=True)
-    )
-    print("Total .json files found:", len(context_files))
-
     # Verify source paths exist before proceeding
     if not os.path.exists(images_root):
         print(f"Error: Image path does not exist - {images_root}")
@@ -228,7 +290,13 @@ def file_distribution(
     create_directory_structure(data_folder_root, num_servers, num_shells_per_server)
 
     print("Collecting file pairs...")
-    pairs = get_all_image_context_pairs(images_root, context_root, image_extension)
+    pairs, image_count, context_count = get_all_image_context_pairs(
+        images_root, context_root, image_extension
+    )
+
+    # Report the totals counted while collecting the pairs
+    print(f"Total {image_extension} files found: {image_count}")
+    print("Total .json files found:", context_count)
     print(f"Found {len(pairs)} valid image-context file pairs")
 
     if len(pairs) == 0:
@@ -236,7 +304,14 @@ def file_distribution(
         return
 
     print("Distributing files...")
-    distribute_files(pairs, data_folder_root, num_servers, num_shells_per_server)
+    distribute_files(
+        pairs,
+        data_folder_root,
+        num_servers,
+        num_shells_per_server,
+        max_workers,
+        link_mode,
+    )
 
     print("File distribution completed successfully!")
 
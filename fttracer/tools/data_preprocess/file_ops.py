@@ -0,0 +1,208 @@
+"""File transfer helpers shared by the data preprocessing scripts.
+
+Several scripts only copy images to rename or regroup them. When the source
+and destination share a filesystem, a hardlink or reflink gives the same
+result without moving any bytes.
+"""
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Set, Tuple, Union
+
+# ioctl request number for FICLONE on Linux (_IOW(0x94, 9, int))
+FICLONE = 0x40049409
+
+LINK_MODES = ("copy", "hardlink", "reflink")
+
+
+def iter_files(
+    root: str, suffixes: Union[str, Tuple[str, ...]], ignore_case: bool = False
+) -> Iterator[str]:
+    """Recursively yields paths of files under root whose names end with suffixes.
+
+    Uses ``os.scandir`` so file types come from the directory listing itself
+    and no extra stat call is made per entry. Symlinked directories are not
+    followed.
+
+    Args:
+        root: Directory to walk.
+        suffixes: File name suffix or tuple of suffixes to match, e.g. ".json".
+        ignore_case: Match suffixes case-insensitively. Suffixes must then be
+            given in lower case.
+    """
+    stack = [root]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                name = entry.name.lower() if ignore_case else entry.name
+                if name.endswith(suffixes) and entry.is_file():
+                    yield entry.path
+
+
+def iter_relative_files(
+    root: str, suffixes: Union[str, Tuple[str, ...]], ignore_case: bool = False
+) -> Iterator[Tuple[str, str, str]]:
+    """Like iter_files, but also yields where each file sits below root.
+
+    Args:
+        root: Directory to walk.
+        suffixes: File name suffix or tuple of suffixes to match, e.g. ".json".
+        ignore_case: Match suffixes case-insensitively. Suffixes must then be
+            given in lower case.
+
+    Yields:
+        (rel_dir, name, path) of each matching file. rel_dir is the directory
+        relative to root, and "" for files directly in root.
+    """
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            it = os.scandir(os.path.join(root, rel_dir))
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(os.path.join(rel_dir, entry.name))
+                    continue
+                name = entry.name.lower() if ignore_case else entry.name
+                if name.endswith(suffixes) and entry.is_file():
+                    yield rel_dir, entry.name, entry.path
+
+
+def list_file_names(directory: str) -> Set[str]:
+    """Returns the names of all regular files in a directory with a single scan.
+
+    Checking membership in the returned set replaces one ``os.path.exists``
+    stat call per file. A missing directory yields an empty set.
+    """
+    try:
+        with os.scandir(directory) as it:
+            return {entry.name for entry in it if entry.is_file()}
+    except FileNotFoundError:
+        return set()
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """Clones src into dst with a copy-on-write reflink.
+
+    The clone is made in a new temporary file next to dst and then moved over
+    it, so an existing dst is left untouched when cloning fails.
+
+    Returns:
+        True if the filesystem supports reflinks and the clone succeeded.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    # mkstemp opens the file with O_EXCL, so it never reuses an existing file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(dst) or ".", prefix=".reflink-")
+    try:
+        with open(src, "rb") as src_file, os.fdopen(fd, "wb") as tmp_file:
+            fcntl.ioctl(tmp_file.fileno(), FICLONE, src_file.fileno())
+        shutil.copystat(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+def transfer_file(src: str, dst: str, link_mode: str = "copy") -> None:
+    """Places a copy of src at dst using the requested strategy.
+
+    An existing dst is overwritten, matching ``shutil.copy2``, unless it is
+    already the same file as src (e.g. a hardlink from an earlier run), in
+    which case nothing is done. Hardlink and reflink modes fall back to a
+    regular copy when the filesystem does not support them or the paths are
+    on different devices.
+
+    Args:
+        src: Source file path.
+        dst: Destination file path.
+        link_mode: One of "copy", "hardlink" or "reflink".
+
+    Raises:
+        ValueError: If link_mode is not supported.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unsupported link mode: {link_mode}")
+
+    # dst already holds src; copying onto it would truncate the source
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        return
+
+    if link_mode == "hardlink":
+        try:
+            os.link(src, dst)
+            return
+        except FileExistsError:
+            os.remove(dst)
+            try:
+                os.link(src, dst)
+                return
+            except OSError:
+                pass
+        except OSError:
+            pass
+    elif link_mode == "reflink":
+        if _reflink(src, dst):
+            return
+
+    # Replace an existing dst rather than writing through it: it may be a
+    # hardlink to another source left by an earlier hardlink run
+    try:
+        os.remove(dst)
+    except FileNotFoundError:
+        pass
+    shutil.copy2(src, dst)
+
+
+def transfer_files(
+    pairs: List[Tuple[str, str]], link_mode: str = "copy", max_workers=None
+) -> Iterator[Tuple[str, str, Optional[OSError]]]:
+    """Runs transfer_file for many (src, dst) pairs on a thread pool.
+
+    Copies spend their time in the kernel with the GIL released, so running
+    several at once keeps the disk queue busy instead of waiting on each file
+    in turn.
+
+    Args:
+        pairs: (src, dst) paths to transfer.
+        link_mode: One of "copy", "hardlink" or "reflink".
+        max_workers: Number of threads. Defaults to the executor's default.
+
+    Yields:
+        (src, dst, error) in the order of pairs. error is None on success.
+
+    Raises:
+        ValueError: If link_mode is not supported.
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unsupported link mode: {link_mode}")
+
+    def transfer(pair: Tuple[str, str]) -> Optional[OSError]:
+        try:
+            transfer_file(pair[0], pair[1], link_mode)
+        except OSError as e:
+            return e
+        return None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for (src, dst), error in zip(pairs, executor.map(transfer, pairs)):
+            yield src, dst, error
@@ -2,26 +2,35 @@
 
 import json
 import os
-import shutil
+import argparse
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
+from tqdm import tqdm
 
-def get_json_files(images_eval_path: str) -> List[str]:
-    """Get all JSON files from images_eval directory structure.
+from fttracer.tools.data_preprocess.extraction_cache import ExtractionCache
+from fttracer.tools.data_preprocess.file_ops import (
+    LINK_MODES,
+    iter_files,
+    list_file_names,
+    transfer_files,
+)
+from fttracer.tools.data_preprocess.json_io import dumps_json, load_json, load_jsonl
+
+
+def get_json_files(images_eval_path: str) -> Iterator[str]:
+    """Get all JSON and JSONL files from images_eval directory structure.
+
+    JSONL files are the per-book files written by image_eval_refactor with
+    output_format="jsonl", holding one image record per line.
 
     Args:
         images_eval_path: Path to the images_eval directory.
 
-    Returns:
-        List of paths to all JSON files.
+    Yields:
+        Paths to all JSON and JSONL files.
     """
-    json_files = []
-    for root, _, files in os.walk(images_eval_path):
-        for file in files:
-            if file.endswith(".json"):
-                json_files.append(os.path.join(root, file))
-    return json_files
+    yield from iter_files(images_eval_path, (".json", ".jsonl"))
 
 
 def extract_complexity_info(
@@ -36,12 +45,32 @@ def extract_complexity_info(
     Returns:
         Tuple of (book_id, image_id, image_path, complexity_level).
     """
-    with open(json_file_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = load_json(json_file_path)
+    return _complexity_info(data[0], report_dir)
+
+
+def extract_complexity_infos(
+    jsonl_file_path: str, report_dir: str
+) -> List[Tuple[str, str, str, int]]:
+    """Extract complexity information from every record of a JSONL file.
 
-    book_id = data[0]["book_id"]
-    image_id = data[0]["image_id"]
-    complexity_level = data[0]["complexity_level"]
+    Args:
+        jsonl_file_path: Path to the JSONL file.
+        report_dir: Path to the report directory containing images and images_eval.
+
+    Returns:
+        List of (book_id, image_id, image_path, complexity_level) tuples.
+    """
+    return [
+        _complexity_info(record, report_dir) for record in load_jsonl(jsonl_file_path)
+    ]
+
+
+def _complexity_info(record: dict, report_dir: str) -> Tuple[str, str, str, int]:
+    """Build the complexity information tuple of a single image record."""
+    book_id = record["book_id"]
+    image_id = record["image_id"]
+    complexity_level = record["complexity_level"]
 
     # Construct image path - images is at the same level as images_eval
     images_dir = os.path.join(report_dir, "image_eval_yes_images")
@@ -69,18 +98,48 @@ def create_sorted_filename(
 
 def main():
     """Main function to sort images by complexity and copy them to new directory."""
+    parser = argparse.ArgumentParser(
+        description="Sort images by complexity level and copy them to a new directory"
+    )
+    parser.add_argument(
+        "--link_mode",
+        choices=LINK_MODES,
+        default="copy",
+        help="How to place images in the output directory: byte copy, hardlink, or reflink (default: copy)",
+    )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Re-parse every JSON file instead of reusing cached results from previous runs",
+    )
+    parser.add_argument(
+        "--manifest_only",
+        action="store_true",
+        help="Write manifest.jsonl mapping sorted names to original images instead of copying them",
+    )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=None,
+        help="Number of threads used to copy images (default: thread pool default)",
+    )
+    args = parser.parse_args()
+
     # Define paths
     script_dir = os.path.dirname(os.path.abspath(__file__))
     report_dir = os.path.join(script_dir, "report")
     images_eval_path = os.path.join(report_dir, "image_eval_yes")
     output_dir = os.path.join(script_dir, "images_complexity_sort")
+    cache = ExtractionCache(
+        os.path.join(report_dir, ".cache", "image_complexity_sort.manifest")
+    )
 
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
 
-    # Get all JSON files
+    # Get all JSON and JSONL files
     print("Scanning for JSON files...")
-    json_files = get_json_files(images_eval_path)
+    json_files = list(get_json_files(images_eval_path))
     total_files = len(json_files)
     print(f"Found {total_files} JSON files")
 
@@ -89,29 +148,35 @@ def main():
     image_info_list = []
     processed_count = 0
 
-    for json_file in json_files:
+    for json_file in tqdm(json_files, desc="Processing JSON files", mininterval=0.5):
         try:
-            book_id, image_id, image_path, complexity_level = extract_complexity_info(
-                json_file, report_dir
-            )
-            image_info_list.append((book_id, image_id, image_path, complexity_level))
-            processed_count += 1
-            print(
-                f"\rProcessed {processed_count}/{total_files} JSON files",
-                end="",
-                flush=True,
-            )
+            is_jsonl = json_file.endswith(".jsonl")
+            hit, info = (False, None) if args.no_cache else cache.get(json_file)
+            if not hit:
+                if is_jsonl:
+                    info = extract_complexity_infos(json_file, report_dir)
+                else:
+                    info = extract_complexity_info(json_file, report_dir)
+                if not args.no_cache:
+                    cache.put(json_file, info)
+            # A JSONL file holds the records of a whole book
+            for book_id, image_id, image_path, complexity_level in (
+                info if is_jsonl else [info]
+            ):
+                image_info_list.append(
+                    (book_id, image_id, image_path, complexity_level)
+                )
         except (KeyError, json.JSONDecodeError) as e:
-            print(f"\nError processing {json_file}: {e}")
-            processed_count += 1
-            print(
-                f"\rProcessed {processed_count}/{total_files} JSON files",
-                end="",
-                flush=True,
-            )
-            continue
+            tqdm.write(f"Error processing {json_file}: {e}")
+        processed_count += 1
 
-    print(f"\nCompleted processing {processed_count}/{total_files} JSON files")
+    print(f"Completed processing {processed_count}/{total_files} JSON files")
+    if not args.no_cache:
+        print(f"Reused cached results for {cache.hits} JSON files")
+        try:
+            cache.save()
+        except OSError as e:
+            print(f"Warning: Failed to save cache manifest {cache.manifest_path}: {e}")
 
     # Sort by complexity level
     print("Sorting images by complexity level...")
@@ -119,10 +184,17 @@ def main():
     print(f"Sorted {len(image_info_list)} images")
 
     # Copy images to output directory with sorted names
-    print("Copying images to output directory...")
+    if args.manifest_only:
+        print("Writing image manifest...")
+    else:
+        print("Copying images to output directory...")
     complexity_count = {}
     copied_count = 0
+    manifest_lines = []
+    pending_copies = []
     total_images = len(image_info_list)
+    # Scan the images directory once instead of stat-ing every image path
+    existing_names = list_file_names(os.path.join(report_dir, "image_eval_yes_images"))
 
     for book_id, image_id, image_path, complexity_level in image_info_list:
         # Count images per complexity level for proper indexing
@@ -137,29 +209,50 @@ def main():
         output_path = os.path.join(output_dir, new_filename)
 
         # Copy image if it exists
-        if os.path.exists(image_path):
-            try:
-                shutil.copy2(image_path, output_path)
+        if os.path.basename(image_path) in existing_names:
+            if args.manifest_only:
+                # Record where the image lives instead of duplicating it
+                record = {
+                    "original_path": image_path,
+                    "book_id": book_id,
+                    "image_id": image_id,
+                    "complexity_level": complexity_level,
+                    "sort_index": complexity_count[complexity_level],
+                    "sorted_filename": new_filename,
+                }
+                manifest_lines.append(dumps_json(record, indent=False) + b"\n")
                 copied_count += 1
-                print(
-                    f"\rCopied {copied_count}/{total_images} images", end="", flush=True
-                )
-            except Exception as e:
-                print(f"\nError copying {image_path}: {e}")
-                print(
-                    f"\rCopied {copied_count}/{total_images} images", end="", flush=True
-                )
+                continue
+            pending_copies.append((image_path, output_path))
         else:
-            print(f"\nImage not found: {image_path}")
-            print(f"\rCopied {copied_count}/{total_images} images", end="", flush=True)
-
-    print(f"\nCompleted! Copied {copied_count}/{total_images} images to {output_dir}")
+            print(f"Image not found: {image_path}")
+
+    # Run the copies concurrently so the disk is not idle between files
+    for image_path, _, error in tqdm(
+        transfer_files(pending_copies, args.link_mode, args.max_workers),
+        total=len(pending_copies),
+        desc="Copying images",
+        mininterval=0.5,
+    ):
+        if error is None:
+            copied_count += 1
+        else:
+            tqdm.write(f"Error copying {image_path}: {error}")
+
+    if args.manifest_only:
+        manifest_path = os.path.join(output_dir, "manifest.jsonl")
+        with open(manifest_path, "wb") as f:
+            f.writelines(manifest_lines)
+        print(
+            f"Completed! Indexed {copied_count}/{total_images} images in {manifest_path}"
+        )
+    else:
+        print(f"Completed! Copied {copied_count}/{total_images} images to {output_dir}")
 
     # Print summary by complexity level
     print("\nSummary by complexity level:")
-    for level in sorted(complexity_count.keys()):
-        count = sum(1 for _, _, _, complexity in image_info_list if complexity == level)
-        print(f"  Complexity {level}: {count} images")
+    for level in sorted(complexity_count):
+        print(f"  Complexity {level}: {complexity_count[level]} images")
 
 
 if __name__ == "__main__":
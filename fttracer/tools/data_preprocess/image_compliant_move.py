@@ -1,17 +1,51 @@
 import os
 import json
-import shutil
 import argparse
 
-
-def process_json_files(input_dir, images_dir, output_dir):
+from tqdm import tqdm
+
+from fttracer.tools.data_preprocess.extraction_cache import ExtractionCache
+from fttracer.tools.data_preprocess.file_ops import (
+    LINK_MODES,
+    iter_files,
+    list_file_names,
+    transfer_files,
+)
+from fttracer.tools.data_preprocess.json_io import dumps_json, load_json, load_jsonl
+
+# Fields extracted from each JSON file, in the order they are cached
+ITEM_FIELDS = (
+    "is_compliant",
+    "compliance_level",
+    "complexity_level",
+    "book_id",
+    "image_id",
+)
+
+
+def process_json_files(
+    input_dir,
+    images_dir,
+    output_dir,
+    link_mode="copy",
+    use_cache=True,
+    manifest_only=False,
+    max_workers=None,
+):
     """
     Process JSON files and copy corresponding images
 
     Args:
-        input_dir: Path to images_eval_refactor_yes directory
+        input_dir: Path to images_eval_refactor_yes directory, holding either
+            per-image JSON files or per-book JSONL files
         images_dir: Path to original images directory
         output_dir: Path to output images directory
+        link_mode: How to place images in output_dir ("copy", "hardlink" or "reflink")
+        use_cache: Reuse fields extracted from unchanged JSON files in previous
+            runs, cached in output_dir/.cache
+        manifest_only: Write output_dir/index.jsonl pointing at the original
+            images instead of copying them
+        max_workers: Number of threads used to copy images
     """
     # Ensure output directory exists
     os.makedirs(output_dir, exist_ok=True)
@@ -20,77 +54,137 @@ def process_json_files(input_dir, images_dir, output_dir):
     total_files = 0
     successful_copies = 0
     errors = 0
-
-    # Walk through all subdirectories and files in input_dir
-    for root, dirs, files in os.walk(input_dir):
-        for file in files:
-            if file.endswith(".json"):
-                json_path = os.path.join(root, file)
-                total_files += 1
-
-                try:
+    # Kept with the output, since input_dir may be read-only or shared
+    cache = ExtractionCache(
+        os.path.join(output_dir, ".cache", "image_compliant_move.manifest")
+    )
+    # File names present in each book directory, scanned once per book
+    existing_by_book = {}
+    index_lines = []
+    pending_copies = []
+
+    # Walk through all subdirectories and JSON files in input_dir. JSONL
+    # files are the per-book files written by image_eval_refactor with
+    # output_format="jsonl", holding one image record per line.
+    for json_path in tqdm(
+        iter_files(input_dir, (".json", ".jsonl")),
+        desc="Processing JSON files",
+        unit="file",
+        mininterval=0.5,
+    ):
+        total_files += 1
+        is_jsonl = json_path.endswith(".jsonl")
+
+        try:
+            hit, fields = cache.get(json_path) if use_cache else (False, None)
+            if not hit:
+                if is_jsonl:
+                    # One list of fields per record
+                    fields = [
+                        [item.get(key, "") for key in ITEM_FIELDS]
+                        for item in load_jsonl(json_path)
+                    ]
+                    if use_cache:
+                        cache.put(json_path, fields)
+                else:
                     # Read JSON file
-                    with open(json_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
+                    data = load_json(json_path)
 
                     # Process JSON data (assuming each file contains one object)
                     if isinstance(data, list) and len(data) > 0:
                         item = data[0]
+                        fields = [item.get(key, "") for key in ITEM_FIELDS]
+                        if use_cache:
+                            cache.put(json_path, fields)
+
+            if fields is not None:
+                for item_fields in fields if is_jsonl else [fields]:
+                    # Extract field data
+                    (
+                        is_compliant,
+                        compliance_level,
+                        complexity_level,
+                        book_id,
+                        image_id,
+                    ) = item_fields
+
+                    # Build original image path and destination path with .jpg extension
+                    original_image_filename = f"{image_id}.jpg"
+                    original_image_path = os.path.join(
+                        images_dir, book_id, original_image_filename
+                    )
+                    new_filename = f"{book_id}_{image_id}.jpg"
+                    destination_path = os.path.join(output_dir, new_filename)
 
-                        # Extract field data
-                        is_compliant = item.get("is_compliant", "")
-                        compliance_level = item.get("compliance_level", "")
-                        complexity_level = item.get("complexity_level", "")
-                        book_id = item.get("book_id", "")
-                        image_id = item.get("image_id", "")
-
-                        print(f"Processing file: {file}")
-                        print(f"  is_compliant: {is_compliant}")
-                        print(f"  compliance_level: {compliance_level}")
-                        print(f"  complexity_level: {complexity_level}")
-                        print(f"  book_id: {book_id}")
-                        print(f"  image_id: {image_id}")
-
-                        # Build original image path and destination path with .jpg extension
-                        original_image_filename = f"{image_id}.jpg"
-                        original_image_path = os.path.join(
-                            images_dir, book_id, original_image_filename
+                    # Check if original image exists
+                    if book_id not in existing_by_book:
+                        existing_by_book[book_id] = list_file_names(
+                            os.path.join(images_dir, book_id)
                         )
-                        new_filename = f"{book_id}_{image_id}.jpg"
-                        destination_path = os.path.join(output_dir, new_filename)
-
-                        # Check if original image exists
-                        if os.path.exists(original_image_path):
-                            # Copy image
-
-                            shutil.copy2(original_image_path, destination_path)
-                            successful_copies += 1
-                            print(
-                                f"  Copied: {original_image_path} -> {destination_path}"
-                            )
-                        else:
-                            print(
-                                f"  Warning: Original image not found - {original_image_path}"
+                    if original_image_filename in existing_by_book[book_id]:
+                        if manifest_only:
+                            record = dict(zip(ITEM_FIELDS, item_fields))
+                            record["original_path"] = os.path.abspath(
+                                original_image_path
                             )
-                            errors += 1
-
+                            record["output_name"] = new_filename
+                            index_lines.append(dumps_json(record, indent=False) + b"\n")
+                            successful_copies += 1
+                            continue
+                        # Queue the image to be copied
+                        pending_copies.append((original_image_path, destination_path))
                     else:
-                        print(f"  Warning: Invalid JSON file format - {json_path}")
+                        tqdm.write(
+                            f"  Warning: Original image not found - {original_image_path}"
+                        )
                         errors += 1
 
-                except json.JSONDecodeError as e:
-                    print(f"  Error: JSON parsing failed - {json_path}: {e}")
-                    errors += 1
-                except Exception as e:
-                    print(
-                        f"  Error: Exception occurred while processing file - {json_path}: {e}"
-                    )
-                    errors += 1
+            else:
+                tqdm.write(f"  Warning: Invalid JSON file format - {json_path}")
+                errors += 1
+
+        except json.JSONDecodeError as e:
+            tqdm.write(f"  Error: JSON parsing failed - {json_path}: {e}")
+            errors += 1
+        except Exception as e:
+            tqdm.write(
+                f"  Error: Exception occurred while processing file - {json_path}: {e}"
+            )
+            errors += 1
+
+    if use_cache:
+        try:
+            cache.save()
+        except OSError as e:
+            print(f"Warning: Failed to save cache manifest {cache.manifest_path}: {e}")
+
+    # Run the copies concurrently so the disk is not idle between files
+    for original_image_path, _, error in tqdm(
+        transfer_files(pending_copies, link_mode, max_workers),
+        total=len(pending_copies),
+        desc="Copying images",
+        unit="img",
+        mininterval=0.5,
+    ):
+        if error is None:
+            successful_copies += 1
+        else:
+            tqdm.write(
+                f"  Error: Failed to copy image - {original_image_path}: {error}"
+            )
+            errors += 1
+
+    if manifest_only:
+        with open(os.path.join(output_dir, "index.jsonl"), "wb") as f:
+            f.writelines(index_lines)
 
     # Output statistics
     print("\nProcessing completed!")
     print(f"Total JSON files processed: {total_files}")
-    print(f"Successfully copied images: {successful_copies}")
+    if manifest_only:
+        print(f"Images written to index: {successful_copies}")
+    else:
+        print(f"Successfully copied images: {successful_copies}")
     print(f"Number of errors: {errors}")
 
 
@@ -108,6 +202,28 @@ def main():
     parser.add_argument(
         "--output", required=True, help="Path to output images directory"
     )
+    parser.add_argument(
+        "--no_cache",
+        action="store_true",
+        help="Re-parse every JSON file instead of reusing cached results from previous runs",
+    )
+    parser.add_argument(
+        "--link_mode",
+        choices=LINK_MODES,
+        default="copy",
+        help="How to place images in the output directory: byte copy, hardlink, or reflink (default: copy)",
+    )
+    parser.add_argument(
+        "--manifest_only",
+        action="store_true",
+        help="Write index.jsonl pointing at the original images instead of copying them",
+    )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=None,
+        help="Number of threads used to copy images (default: thread pool default)",
+    )
 
     args = parser.parse_args()
 
@@ -121,7 +237,15 @@ def main():
         return
 
     # Execute processing
-    process_json_files(args.input, args.images, args.output)
+    process_json_files(
+        args.input,
+        args.images,
+        args.output,
+        link_mode=args.link_mode,
+        use_cache=not args.no_cache,
+        manifest_only=args.manifest_only,
+        max_workers=args.max_workers,
+    )
 
 
 if __name__ == "__main__":
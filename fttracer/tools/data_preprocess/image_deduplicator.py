@@ -8,29 +8,40 @@ image_deduplicator.py
 ├── find_all_images()                    # Public function: Find all image paths in directory
 ├── mark_or_delete_duplicates()          # Public function: Handle duplicates (mark/delete)
 ├── compute_embedding()                  # Generate feature vector using AI model
+├── compute_embeddings_batch()           # Generate feature vectors for a batch of images
+├── compute_hashes()                     # Calculate several perceptual hashes from one decode
 ├── compute_hash()                       # Calculate perceptual hash (pHash/dHash/aHash)
+├── find_similar_pairs()                 # Vectorized cosine-similarity pair search
+├── find_close_hash_pairs()              # Vectorized Hamming-distance pair search
+├── cluster_duplicates()                 # Union-find grouping of matched pairs
 ├── image_deduplication_embedding()      # Main workflow: Semantic deduplication using embeddings
 ├── image_deduplication_hash()           # Main workflow: Visual similarity deduplication using hashing
 └── main()                               # CLI entry point, routes to deduplication strategies
 """
 
 import os
+import mmap
 import time
 import base64
 import argparse
 from pathlib import Path
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from http import HTTPStatus
-from typing import Optional, List, Tuple
+from typing import Dict, Iterator, Optional, List, Tuple
 
 import dashscope
 import imagehash
 import numpy as np
 from PIL import Image
+from tqdm import tqdm
 
 # Configuration
 DASHSCOPE_API_KEY = os.getenv("DASHSCOPE_API_KEY")
 IMAGE_PATH = "parse_results"
 REQUIRE_MANUAL_CONFIRMATION = 1  # 0: Auto-delete, 1: Mark for review
+EMBEDDING_WORKERS = 8  # Concurrent DashScope requests for embedding
+EMBEDDING_BATCH_SIZE = 20  # Images sent per DashScope embedding request
 
 
 def find_all_images(base_path: str) -> List[Path]:
@@ -130,8 +141,13 @@ def mark_or_delete_duplicates(
 
 # Embedding-based Deduplication
 def encode_image(image_path):
+    # Encode straight from a read-only mapping of the file so the raw JPEG is
+    # never copied into an intermediate bytes object
     with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode("utf-8")
+        if os.fstat(image_file.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(image_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return base64.b64encode(mm).decode("ascii")
 
 
 def compute_embedding(image_path: str) -> Optional[list]:
@@ -161,6 +177,43 @@ def compute_embedding(image_path: str) -> Optional[list]:
         return None
 
 
+def compute_embeddings_batch(image_paths: List[str]) -> List[Optional[list]]:
+    """Computes embeddings for several images with a single DashScope API call.
+
+    Falls back to per-image requests if the batched call fails, so one bad image
+    does not discard the embeddings of the whole batch.
+    """
+    embeddings: List[Optional[list]] = [None] * len(image_paths)
+    batch_indices = []
+    input_data = []
+    for idx, image_path in enumerate(image_paths):
+        if not os.path.exists(image_path):
+            print(f"Warning: Image path not found: {image_path}")
+            continue
+        base64_image = encode_image(os.path.abspath(image_path))
+        input_data.append({"image": f"data:image/jpg;base64,{base64_image}"})
+        batch_indices.append(idx)
+
+    if not input_data:
+        return embeddings
+
+    try:
+        resp = dashscope.MultiModalEmbedding.call(
+            model="multimodal-embedding-v1", input=input_data
+        )
+        if resp.status_code == HTTPStatus.OK:
+            for item in resp.output["embeddings"]:
+                embeddings[batch_indices[item["index"]]] = item["embedding"]
+            return embeddings
+        print(f"Batch API Error: {resp.code}, {resp.message}; retrying individually")
+    except Exception as e:
+        print(f"Exception while processing batch: {e}; retrying individually")
+
+    for idx in batch_indices:
+        embeddings[idx] = compute_embedding(image_paths[idx])
+    return embeddings
+
+
 def cosine_similarity(vec1: list, vec2: list) -> float:
     """Calculates the cosine similarity between two vectors."""
     dot_product = np.dot(vec1, vec2)
@@ -171,10 +224,158 @@ def cosine_similarity(vec1: list, vec2: list) -> float:
     return dot_product / (norm_vec1 * norm_vec2)
 
 
+def _bucket_blocks(
+    keys: np.ndarray, block_size: int
+) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Yields the index pairs (i < j) of items sharing a bucket key, block-wise.
+
+    Each block pairs up to block_size items of a bucket with the later items
+    of the same bucket, so memory stays bounded like a blocked all-pairs
+    compare even when one bucket holds most of the input.
+
+    Args:
+        keys: One integer bucket key per item.
+        block_size: Maximum number of rows per block.
+
+    Yields:
+        (rows, cols, upper): indices of the block's rows and of the bucket
+        items they are compared with, and a (len(rows), len(cols)) mask that
+        is True where cols[c] comes after rows[r] in the bucket. Indices in a
+        bucket are ascending, so the mask also selects i < j.
+    """
+    order = np.argsort(keys, kind="stable")
+    for group in np.split(order, np.flatnonzero(np.diff(keys[order])) + 1):
+        for start in range(0, len(group) - 1, block_size):
+            rows = group[start : start + block_size]
+            cols = group[start + 1 :]
+            upper = np.arange(len(cols))[None, :] >= np.arange(len(rows))[:, None]
+            yield rows, cols, upper
+
+
+def _first_shared_bucket(
+    keys: np.ndarray, index: int, rows: np.ndarray, cols: np.ndarray
+) -> np.ndarray:
+    """Marks the pairs for which bucketing keys[index] is the first shared one.
+
+    A pair can share a bucket in several bands or tables. Reporting it only
+    from the first one replaces a global deduplication of all candidates.
+
+    Args:
+        keys: Bucket keys of shape (num_bandings, num_items).
+        index: Banding the pairs were found in.
+        rows: First index of each pair.
+        cols: Second index of each pair.
+    """
+    return ~(keys[:index, rows] == keys[:index, cols]).any(axis=0)
+
+
+def _bits_to_keys(bits: np.ndarray) -> np.ndarray:
+    """Packs each row of up to 64 boolean columns into one integer key."""
+    weights = np.left_shift(np.uint64(1), np.arange(bits.shape[1], dtype=np.uint64))
+    return bits.astype(np.uint64) @ weights
+
+
+def find_similar_pairs(
+    embeddings: List[list],
+    similarity_threshold: float,
+    block_size: int = 4096,
+    lsh_tables: int = 0,
+    lsh_bits: int = 16,
+    seed: int = 0,
+) -> List[Tuple[int, int, float]]:
+    """Finds all index pairs (i < j) whose cosine similarity meets the threshold.
+
+    Embeddings are L2-normalized once and compared with a blocked matrix product,
+    so the similarity matrix is never materialized in full for large inputs.
+
+    With lsh_tables > 0, only pairs that land in the same random-hyperplane
+    bucket in at least one table are compared. This is approximate: more tables
+    raise recall, more bits per table shrink the buckets.
+    """
+    emb = np.asarray(embeddings, dtype=np.float32)
+    emb /= np.linalg.norm(emb, axis=1, keepdims=True).clip(min=1e-12)
+
+    if lsh_tables > 0:
+        rng = np.random.default_rng(seed)
+        keys = np.empty((lsh_tables, len(emb)), dtype=np.uint64)
+        for table in range(lsh_tables):
+            hyperplanes = rng.standard_normal((emb.shape[1], lsh_bits))
+            signs = emb @ hyperplanes.astype(np.float32) > 0
+            keys[table] = _bits_to_keys(signs)
+
+        pairs = []
+        for table in range(lsh_tables):
+            for rows, cols, upper in _bucket_blocks(keys[table], block_size):
+                block_sims = emb[rows] @ emb[cols].T
+                r, c = np.nonzero((block_sims >= similarity_threshold) & upper)
+                sims = block_sims[r, c]
+                i, j = rows[r], cols[c]
+                keep = _first_shared_bucket(keys, table, i, j)
+                pairs.extend(
+                    zip(i[keep].tolist(), j[keep].tolist(), sims[keep].tolist())
+                )
+        # Report pairs in the same order as the all-pairs search
+        pairs.sort()
+        return pairs
+
+    pairs = []
+    for start in range(0, len(emb), block_size):
+        block_sims = emb[start : start + block_size] @ emb.T
+        rows, cols = np.nonzero(block_sims >= similarity_threshold)
+        # Keep only the upper triangle so each pair is reported once
+        upper = cols > rows + start
+        rows, cols = rows[upper], cols[upper]
+        pairs.extend(
+            zip((rows + start).tolist(), cols.tolist(), block_sims[rows, cols].tolist())
+        )
+    return pairs
+
+
+def cluster_duplicates(
+    pairs: List[Tuple[int, int, float]], num_items: int
+) -> Dict[int, List[int]]:
+    """Groups matched index pairs into duplicate clusters with union-find.
+
+    Matches are transitive (A~B and B~C put A, B and C in one cluster), so each
+    cluster is reported once as its lowest index plus the remaining members
+    instead of as every matched pair.
+
+    Args:
+        pairs: (i, j, value) tuples produced by the pair search.
+        num_items: Total number of items the indices refer to.
+
+    Returns:
+        Mapping from each cluster's representative index to its other members.
+    """
+    parent = list(range(num_items))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for i, j, _ in pairs:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            # Keep the smaller index as root so the first-found image is kept
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    clusters: Dict[int, List[int]] = {}
+    for idx in range(num_items):
+        root = find(idx)
+        if root != idx:
+            clusters.setdefault(root, []).append(idx)
+    return clusters
+
+
 def image_deduplication_embedding(
     image_path: str = IMAGE_PATH,
     similarity_threshold: float = 0.98,
     require_manual_confirmation: int = REQUIRE_MANUAL_CONFIRMATION,
+    max_workers: int = EMBEDDING_WORKERS,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    lsh_tables: int = 0,
 ) -> None:
     start_time = time.time()
     all_image_paths = find_all_images(image_path)
@@ -184,11 +385,27 @@ def image_deduplication_embedding(
         print("No images found to process.")
         return
 
+    # Embedding requests are network-bound, so threads are sufficient
+    path_strs = [str(p) for p in all_image_paths]
+    batches = [
+        path_strs[i : i + batch_size] for i in range(0, len(path_strs), batch_size)
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        embeddings = [
+            embedding
+            for batch_embeddings in tqdm(
+                executor.map(compute_embeddings_batch, batches),
+                total=len(batches),
+                desc="Computing embeddings",
+                unit="batch",
+                mininterval=0.5,
+            )
+            for embedding in batch_embeddings
+        ]
+
     image_embeddings = []
     valid_image_paths = []
-    for i, img_path in enumerate(all_image_paths):
-        print(f"Processing image {i + 1}/{len(all_image_paths)}")
-        embedding = compute_embedding(str(img_path))
+    for img_path, embedding in zip(all_image_paths, embeddings):
         if embedding is not None:
             image_embeddings.append(embedding)
             valid_image_paths.append(img_path)
@@ -207,15 +424,24 @@ def image_deduplication_embedding(
     duplicates_to_handle = []
     similarities = []
 
-    for i in range(len(image_embeddings)):
-        for j in range(i + 1, len(image_embeddings)):
-            sim = cosine_similarity(image_embeddings[i], image_embeddings[j])
+    similar_pairs = find_similar_pairs(
+        image_embeddings, similarity_threshold, lsh_tables=lsh_tables
+    )
+    clusters = cluster_duplicates(similar_pairs, len(valid_image_paths))
+    print(
+        f"Grouped {len(similar_pairs)} similar pair(s) into {len(clusters)} cluster(s)."
+    )
 
-            if sim >= similarity_threshold:
-                path1 = valid_image_paths[i]
-                path2 = valid_image_paths[j]
-                duplicates_to_handle.append((path1, path2))
-                similarities.append(sim)
+    for representative, members in clusters.items():
+        for member in members:
+            duplicates_to_handle.append(
+                (valid_image_paths[representative], valid_image_paths[member])
+            )
+            similarities.append(
+                cosine_similarity(
+                    image_embeddings[representative], image_embeddings[member]
+                )
+            )
 
     mark_or_delete_duplicates(
         duplicates_to_handle=duplicates_to_handle,
@@ -227,35 +453,130 @@ def image_deduplication_embedding(
 
 
 # Hash-based Deduplication
-def compute_hash(
-    image_path: str, hash_type: str = "phash"
-) -> Optional[imagehash.ImageHash]:
-    """Computes the perceptual hash for a single image."""
+HASH_FUNCTIONS = {
+    "ahash": imagehash.average_hash,
+    "dhash": imagehash.dhash,
+    "phash": imagehash.phash,
+}
+
+# Smallest image side JPEGs are scaled down to while decoding. This is 8x the
+# 32 px phash resizes to, so libjpeg's own downscale stays small next to the
+# resize done by the hash functions
+HASH_DRAFT_SIZE = 256
+
+
+def compute_hashes(
+    image_path: str, hash_types: Tuple[str, ...] = ("phash",)
+) -> Optional[Dict[str, imagehash.ImageHash]]:
+    """Computes several perceptual hashes from a single decode of an image.
+
+    JPEGs are decoded with ``Image.draft`` so libjpeg scales them down while
+    decoding instead of producing full-resolution pixels that the hash
+    functions immediately shrink again. The grayscale image is then shared by
+    all requested hash types.
+
+    Hash values are therefore not identical to hashing a full-resolution
+    decode: on sample JPEGs phash and dhash moved by up to 2-3 bits and ahash
+    by up to 4 bits, mostly 0. Compare hashes computed by this function with
+    each other rather than with hashes stored by older versions.
+    """
     try:
-        img = Image.open(image_path)
-        if hash_type == "ahash":
-            return imagehash.average_hash(img)
-        elif hash_type == "dhash":
-            return imagehash.dhash(img)
-        elif hash_type == "phash":
-            return imagehash.phash(img)
-        else:
-            raise ValueError("Unsupported hash type")
+        unsupported = [t for t in hash_types if t not in HASH_FUNCTIONS]
+        if unsupported:
+            raise ValueError(f"Unsupported hash type: {', '.join(unsupported)}")
+
+        with Image.open(image_path) as img:
+            img.draft("L", (HASH_DRAFT_SIZE, HASH_DRAFT_SIZE))
+            gray = img.convert("L")
+        return {t: HASH_FUNCTIONS[t](gray) for t in hash_types}
     except Exception as e:
         print(f"Exception while processing {image_path}: {e}")
         return None
 
 
+def compute_hash(
+    image_path: str, hash_type: str = "phash"
+) -> Optional[imagehash.ImageHash]:
+    """Computes the perceptual hash for a single image."""
+    hashes = compute_hashes(image_path, (hash_type,))
+    return hashes[hash_type] if hashes is not None else None
+
+
 def hamming_distance(hash1: imagehash.ImageHash, hash2: imagehash.ImageHash) -> int:
     """Calculates the Hamming distance between two image hashes."""
     return hash1 - hash2
 
 
+# Number of set bits for every possible byte value
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def find_close_hash_pairs(
+    hashes: List[imagehash.ImageHash],
+    hash_threshold: int,
+    block_size: int = 1024,
+    min_band_bits: int = 8,
+) -> List[Tuple[int, int, int]]:
+    """Finds all index pairs (i < j) whose Hamming distance is within the threshold.
+
+    Hashes are packed into byte rows and compared block-wise with a vectorized
+    XOR followed by a per-byte popcount lookup.
+
+    For large inputs the hash bits are first split into hash_threshold + 1
+    bands. Two hashes that differ in at most hash_threshold bits must agree
+    exactly on at least one band, so comparing only hashes that share a band
+    finds every pair while skipping the rest. Bucketing is skipped when the
+    bands would be narrower than min_band_bits, as the buckets then hold most
+    of the input anyway.
+    """
+    bits = np.stack([h.hash.ravel() for h in hashes])
+    packed = np.packbits(bits, axis=1)
+
+    band_bits = bits.shape[1] // (hash_threshold + 1)
+    if len(hashes) > block_size and band_bits >= min_band_bits:
+        bands = np.array_split(np.arange(bits.shape[1]), hash_threshold + 1)
+        keys = np.stack([_bits_to_keys(bits[:, band]) for band in bands])
+
+        pairs = []
+        for index in range(len(bands)):
+            for rows, cols, upper in _bucket_blocks(keys[index], block_size):
+                xor = packed[rows, None, :] ^ packed[None, cols, :]
+                block_dists = _POPCOUNT_TABLE[xor].sum(axis=-1, dtype=np.int64)
+                r, c = np.nonzero((block_dists <= hash_threshold) & upper)
+                dists = block_dists[r, c]
+                i, j = rows[r], cols[c]
+                keep = _first_shared_bucket(keys, index, i, j)
+                pairs.extend(
+                    zip(i[keep].tolist(), j[keep].tolist(), dists[keep].tolist())
+                )
+        # Report pairs in the same order as the all-pairs search
+        pairs.sort()
+        return pairs
+
+    pairs = []
+    for start in range(0, len(packed), block_size):
+        xor = packed[start : start + block_size, None, :] ^ packed[None, :, :]
+        block_dists = _POPCOUNT_TABLE[xor].sum(axis=-1, dtype=np.int64)
+        rows, cols = np.nonzero(block_dists <= hash_threshold)
+        # Keep only the upper triangle so each pair is reported once
+        upper = cols > rows + start
+        rows, cols = rows[upper], cols[upper]
+        pairs.extend(
+            zip(
+                (rows + start).tolist(),
+                cols.tolist(),
+                block_dists[rows, cols].tolist(),
+            )
+        )
+    return pairs
+
+
 def image_deduplication_hash(
     image_path: str = IMAGE_PATH,
     hash_threshold: int = 5,
     require_manual_confirmation: int = REQUIRE_MANUAL_CONFIRMATION,
     hash_type: str = "ahash",
+    max_workers: Optional[int] = None,
 ) -> None:
     start_time = time.time()
     all_image_paths = find_all_images(image_path)
@@ -265,11 +586,25 @@ def image_deduplication_hash(
         print("No images found to process.")
         return
 
+    # Decoding and hashing are CPU-bound, so spread them across processes
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        hashes = list(
+            tqdm(
+                executor.map(
+                    partial(compute_hash, hash_type=hash_type),
+                    map(str, all_image_paths),
+                    chunksize=16,
+                ),
+                total=len(all_image_paths),
+                desc="Computing hashes",
+                unit="img",
+                mininterval=0.5,
+            )
+        )
+
     image_hashes = []
     valid_image_paths = []
-    for i, img_path in enumerate(all_image_paths):
-        print(f"Processing image {i + 1}/{len(all_image_paths)}")
-        img_hash = compute_hash(str(img_path), hash_type)
+    for img_path, img_hash in zip(all_image_paths, hashes):
         if img_hash is not None:
             image_hashes.append(img_hash)
             valid_image_paths.append(img_path)
@@ -288,15 +623,18 @@ def image_deduplication_hash(
     duplicates_to_handle = []
     distances = []
 
-    for i in range(len(image_hashes)):
-        for j in range(i + 1, len(image_hashes)):
-            dist = hamming_distance(image_hashes[i], image_hashes[j])
+    close_pairs = find_close_hash_pairs(image_hashes, hash_threshold)
+    clusters = cluster_duplicates(close_pairs, len(valid_image_paths))
+    print(f"Grouped {len(close_pairs)} close pair(s) into {len(clusters)} cluster(s).")
 
-            if dist <= hash_threshold:
-                path1 = valid_image_paths[i]
-                path2 = valid_image_paths[j]
-                duplicates_to_handle.append((path1, path2))
-                distances.append(dist)
+    for representative, members in clusters.items():
+        for member in members:
+            duplicates_to_handle.append(
+                (valid_image_paths[representative], valid_image_paths[member])
+            )
+            distances.append(
+                hamming_distance(image_hashes[representative], image_hashes[member])
+            )
 
     mark_or_delete_duplicates(
         duplicates_to_handle=duplicates_to_handle,
@@ -314,6 +652,8 @@ def deduplicate_image(
     hash_threshold: int = 5,
     hash_type: str = "ahash",
     auto_delete: bool = False,
+    max_workers: Optional[int] = None,
+    lsh_tables: int = 0,
 ):
     """
     Run image deduplication using either embedding or hash-based method.
@@ -325,6 +665,8 @@ def deduplicate_image(
         hash_threshold (int): For hash method, Hamming distance threshold
         hash_type (str): Type of hash to use ('ahash', 'dhash', 'phash')
         auto_delete (bool): If True, automatically delete duplicates; otherwise, mark for review
+        max_workers (int): Number of parallel workers (threads for embedding, processes for hash)
+        lsh_tables (int): For embedding method, number of LSH tables used to prune comparisons (0 compares all pairs)
     """
     require_manual_confirmation = 0 if auto_delete else 1
 
@@ -333,6 +675,8 @@ def deduplicate_image(
             image_path=image_path,
             similarity_threshold=similarity_threshold,
             require_manual_confirmation=require_manual_confirmation,
+            max_workers=max_workers or EMBEDDING_WORKERS,
+            lsh_tables=lsh_tables,
         )
     elif method == "hash":
         image_deduplication_hash(
@@ -340,6 +684,7 @@ def deduplicate_image(
             hash_threshold=hash_threshold,
             hash_type=hash_type,
             require_manual_confirmation=require_manual_confirmation,
+            max_workers=max_workers,
         )
     else:
         raise ValueError("Invalid method. Choose 'embedding' or 'hash'.")
@@ -381,6 +726,18 @@ def main():
         action="store_true",
         help="Auto-delete duplicates without confirmation",
     )
+    parser.add_argument(
+        "--max_workers",
+        type=int,
+        default=None,
+        help="Number of parallel workers (default: 8 threads for embedding, CPU count for hash)",
+    )
+    parser.add_argument(
+        "--lsh_tables",
+        type=int,
+        default=0,
+        help="Approximate embedding search with this many LSH tables (default: 0, compare all pairs)",
+    )
 
     args = parser.parse_args()
 
@@ -391,6 +748,8 @@ def main():
         hash_threshold=args.hash_threshold,
         hash_type=args.hash_type,
         auto_delete=args.auto_delete,
+        max_workers=args.max_workers,
+        lsh_tables=args.lsh_tables,
     )
 
 
@@ -1,67 +1,98 @@
 import os
-import json
 import shutil
 
+from tqdm import tqdm
 
-def process_json_files(input_dir, output_dir_yes, output_dir_no):
+from fttracer.tools.data_preprocess.json_io import dump_json, dumps_json, load_json
+
+OUTPUT_FORMATS = ("json", "jsonl")
+
+
+def process_json_files(input_dir, output_dir_yes, output_dir_no, output_format="json"):
     """
     Add the fields of book_id and image_id for the JSON files, and maintain the original directory structure
 
     Args:
         input_dir
         output_dir
+        output_format: "json" writes one JSON file per image under a directory
+            per book. "jsonl" writes a single "{book_id}.jsonl" per book with
+            one record per line, which avoids creating one small file per image.
+            image_complexity_sort and image_compliant_move read both formats.
     """
+    if output_format not in OUTPUT_FORMATS:
+        print(f"Error: Unsupported output format '{output_format}'")
+        return
 
     # Check if the input directory exists
     if not os.path.exists(input_dir):
         print(f"Error: The dir '{input_dir}' doesn't exist! ")
         return
 
-    # Traverse all subdirectories under the input directory
-    for book_id in os.listdir(input_dir):
-        book_dir = os.path.join(input_dir, book_id)
+    if output_format == "jsonl":
+        os.makedirs(output_dir_yes, exist_ok=True)
+        os.makedirs(output_dir_no, exist_ok=True)
+
+    # Collect the book directories under the input directory. DirEntry.is_dir
+    # uses the file type from the directory listing, so no stat per entry.
+    with os.scandir(input_dir) as it:
+        book_entries = [entry for entry in it if entry.is_dir()]
 
-        # confirm
-        if not os.path.isdir(book_dir):
-            continue
+    # Traverse all subdirectories under the input directory
+    for book_entry in tqdm(
+        book_entries, desc="Refactoring books", unit="book", mininterval=0.5
+    ):
+        book_id = book_entry.name
 
         # create the corresponding output dir
         output_book_dir_yes = os.path.join(output_dir_yes, book_id)
         output_book_dir_no = os.path.join(output_dir_no, book_id)
-        if not os.path.exists(output_book_dir_yes):
-            os.makedirs(output_book_dir_yes)
-        if not os.path.exists(output_book_dir_no):
-            os.makedirs(output_book_dir_no)
+        if output_format == "json":
+            os.makedirs(output_book_dir_yes, exist_ok=True)
+            os.makedirs(output_book_dir_no, exist_ok=True)
+        # Records of this book for the JSONL output
+        lines_yes = []
+        lines_no = []
 
         # Traverse all JSON files in this directory.
-        for filename in os.listdir(book_dir):
-            if filename.endswith(".json"):
-                image_id = filename.replace(".json", ".jpg")
-                json_path = os.path.join(book_dir, filename)
-                output_json_path_yes = os.path.join(output_book_dir_yes, filename)
-                output_json_path_no = os.path.join(output_book_dir_no, filename)
-
-                try:
-                    # Read the file
-                    with open(json_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-
-                    # Add book_i and image_id fields
-                    data["book_id"] = book_id
-                    data["image_id"] = image_id
-
-                    # Wrap the data in a list and save it
-
-                    if data["is_compliant"] == "yes":
-                        with open(output_json_path_yes, "w", encoding="utf-8") as f:
-                            json.dump([data], f, ensure_ascii=False, indent=2)
-                            print(f"Success: {json_path} -> {output_json_path_yes}")
-                    else:
-                        with open(output_json_path_no, "w", encoding="utf-8") as f:
-                            json.dump([data], f, ensure_ascii=False, indent=2)
-                            print(f"Success: {json_path} -> {output_json_path_no}")
-
-                except Exception as e:
-                    print(f"File: {json_path}  Error: {e}")
+        with os.scandir(book_entry.path) as file_entries:
+            json_names = [
+                entry.name for entry in file_entries if entry.name.endswith(".json")
+            ]
+        for filename in json_names:
+            image_id = filename.replace(".json", ".jpg")
+            json_path = os.path.join(book_entry.path, filename)
+            output_json_path_yes = os.path.join(output_book_dir_yes, filename)
+            output_json_path_no = os.path.join(output_book_dir_no, filename)
+
+            try:
+                # Read the file
+                data = load_json(json_path)
+
+                # Add book_i and image_id fields
+                data["book_id"] = book_id
+                data["image_id"] = image_id
+
+                if output_format == "jsonl":
+                    # Buffer one compact record per line for this book
+                    lines = lines_yes if data["is_compliant"] == "yes" else lines_no
+                    lines.append(dumps_json(data, indent=False) + b"\n")
+                # Wrap the data in a list and save it
+                elif data["is_compliant"] == "yes":
+                    dump_json([data], output_json_path_yes)
+                else:
+                    dump_json([data], output_json_path_no)
+
+            except Exception as e:
+                tqdm.write(f"File: {json_path}  Error: {e}")
+
+        # Write each book's records with a single open per output file
+        for output_dir, lines in (
+            (output_dir_yes, lines_yes),
+            (output_dir_no, lines_no),
+        ):
+            if lines:
+                with open(os.path.join(output_dir, f"{book_id}.jsonl"), "wb") as f:
+                    f.writelines(lines)
 
     print(f"Completed!")
@@ -1,10 +1,106 @@
 """Script to analyze compliance and complexity levels from JSON files, 
 extract top complex images, and filter based on chart types and content themes."""
 
+import heapq
 import os
-import json
-import statistics
-from collections import Counter
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from fttracer.tools.data_preprocess.json_io import load_json_fields
+
+# Value types that are coerced to int when reading classification fields
+_STR_FLOAT = (str, float)
+
+# Classification files at least this large are parsed from a memory map
+CLASSIFICATION_MMAP_MIN_SIZE = 4096
+
+# Files at least this large are streamed with ijson (when installed) and only
+# parsed up to the fields below
+STREAM_MIN_SIZE = 16384
+EVALUATION_FIELDS = ("compliance_level", "complexity_level")
+CLASSIFICATION_FIELDS = ("chart_type", "content_theme")
+
+
+def _parse_evaluation_file(file_path):
+    """Read the compliance and complexity levels from one evaluation JSON file.
+
+    Runs in a worker process, so errors are returned instead of printed.
+
+    Args:
+        file_path (str): Path to the evaluation JSON file
+
+    Returns:
+        tuple: (compliance_level, complexity_level, error). Levels are None when
+        missing, error is the message to log if the file could not be parsed
+    """
+    try:
+        # Load the needed fields from the JSON file
+        get = load_json_fields(
+            file_path, EVALUATION_FIELDS, stream_min_size=STREAM_MIN_SIZE
+        ).get
+
+        # Extract and normalize compliance_level to integer
+        compliance_level = get("compliance_level")
+        if isinstance(compliance_level, str):
+            # Convert string representation of number to integer
+            compliance_level = int(compliance_level)
+
+        # Extract and normalize complexity_level to integer
+        complexity_level = get("complexity_level")
+        if isinstance(complexity_level, str):
+            # Convert string representation of number to integer
+            complexity_level = int(complexity_level)
+
+        return compliance_level, complexity_level, None
+    except Exception as e:
+        return None, None, f"Error processing file {file_path}: {e}"
+
+
+def _parse_classification_file(json_file_path, keep_chart_types):
+    """Read the chart types and content themes from one classification JSON file.
+
+    Runs in a worker process, so errors are returned instead of printed.
+
+    Args:
+        json_file_path (str): Path to the classification JSON file
+        keep_chart_types (set): Set of chart type IDs to keep
+
+    Returns:
+        tuple: (has_valid_chart_type, content_themes, error). error is the
+        message to log if the file is missing or could not be parsed
+    """
+    try:
+        # Load the needed fields from the classification file
+        get = load_json_fields(
+            json_file_path,
+            CLASSIFICATION_FIELDS,
+            stream_min_size=STREAM_MIN_SIZE,
+            mmap_min_size=CLASSIFICATION_MMAP_MIN_SIZE,
+        ).get
+
+        # Extract chart types and content themes from JSON data
+        # These fields contain the classification information for the image
+        chart_types = get("chart_type", [])
+        content_themes = get("content_theme", [])
+
+        # Convert chart types and content themes to integers if they are strings or floats
+        # This ensures consistent data type for comparison operations
+        # Chart types are converted lazily and isdisjoint stops at the first match
+        has_valid_chart_type = not keep_chart_types.isdisjoint(map(int, chart_types))
+        content_themes = [
+            int(t) if isinstance(t, _STR_FLOAT) else t for t in content_themes
+        ]
+
+        return has_valid_chart_type, content_themes, None
+    except FileNotFoundError:
+        # Opening directly instead of checking os.path.exists first saves a
+        # stat call for every file that does exist
+        return False, None, f"File not found: {json_file_path}"
+    except Exception as e:
+        return False, None, f"Error processing file {json_file_path}: {e}"
 
 
 def sample_images(
@@ -16,6 +112,7 @@ def sample_images(
     keep_chart_types=None,
     sampling_limit_per_theme=200,
     show_stats=True,
+    max_workers=None,
 ):
     """
     Main function to process JSON files, compute statistics, extract top complex images,
@@ -30,6 +127,7 @@ def sample_images(
         keep_chart_types (set): Set of chart type IDs to keep (default: {1, 2, 6, 9, 11})
         sampling_limit_per_theme (int): Maximum number of images per content theme (default: 200)
         show_stats (bool): Whether to print detailed statistics. Default is True
+        max_workers (int): Number of processes used to parse JSON files (default: CPU count)
     """
 
     # Set default chart types if none provided
@@ -45,58 +143,71 @@ def sample_images(
     complexity_levels = []
     total_files = 0
 
-    # Store records that meet the condition: compliance_level in specified thresholds
+    # Keep records that meet the condition: compliance_level in specified thresholds
     # These are considered high compliance images that we want to analyze for complexity
-    filtered_records = []
-
-    # Traverse all subdirectories in base_path to process JSON files
-    for folder_name in os.listdir(json_evaluation_path):
-        folder_path = os.path.join(json_evaluation_path, folder_name)
-
-        # Only process directories, skip files
-        if not os.path.isdir(folder_path):
-            continue
-
-        # Process each JSON file in the current directory
-        for file_name in os.listdir(folder_path):
-            if not file_name.endswith(".json"):
+    # Only the complexity_top_n most complex ones are kept, in a min-heap of
+    # (complexity_level, -arrival, folder_name, file_name) entries; -arrival
+    # makes earlier records win ties, as a stable sort would
+    top_heap = []
+    filtered_records_count = 0
+
+    # Traverse all subdirectories in base_path to collect JSON files.
+    # DirEntry carries the file type from the directory listing, so no extra
+    # stat call is needed per entry.
+    json_files = []
+    with os.scandir(json_evaluation_path) as folder_entries:
+        for folder_entry in folder_entries:
+            # Only process directories, skip files
+            if not folder_entry.is_dir():
                 continue
 
-            file_path = os.path.join(folder_path, file_name)
-
-            try:
-                # Load JSON data from file
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-
-                # Extract and normalize compliance_level to integer
-                compliance_level = data.get("compliance_level")
-                if compliance_level is not None:
-                    if isinstance(compliance_level, str):
-                        # Convert string representation of number to integer
-                        compliance_level = int(compliance_level)
-                    compliance_levels.append(compliance_level)
-
-                # Extract and normalize complexity_level to integer
-                complexity_level = data.get("complexity_level")
-                if complexity_level is not None:
-                    if isinstance(complexity_level, str):
-                        # Convert string representation of number to integer
-                        complexity_level = int(complexity_level)
-                    complexity_levels.append(complexity_level)
-
-                    # Save record if compliance level meets threshold criteria
-                    # This ensures we only consider well-compliant images for complexity analysis
-                    if compliance_level in compliance_thresholds:
-                        filtered_records.append(
-                            (complexity_level, folder_name, file_name)
+            # Collect each JSON file in the current directory
+            with os.scandir(folder_entry.path) as file_entries:
+                for file_entry in file_entries:
+                    if file_entry.name.endswith(".json"):
+                        json_files.append(
+                            (folder_entry.name, file_entry.name, file_entry.path)
                         )
 
-                total_files += 1
-
-            except Exception as e:
+    # Parse the files in worker processes; results come back in input order
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            _parse_evaluation_file,
+            [file_path for _, _, file_path in json_files],
+            chunksize=256,
+        )
+        for (folder_name, file_name, _), (
+            compliance_level,
+            complexity_level,
+            error,
+        ) in zip(json_files, results):
+            if error is not None:
                 # Log any errors encountered while processing individual files
-                print(f"Error processing file {file_path}: {e}")
+                print(error)
+                continue
+
+            if compliance_level is not None:
+                compliance_levels.append(compliance_level)
+
+            if complexity_level is not None:
+                complexity_levels.append(complexity_level)
+
+                # Save record if compliance level meets threshold criteria
+                # This ensures we only consider well-compliant images for complexity analysis
+                if compliance_level in compliance_thresholds:
+                    filtered_records_count += 1
+                    entry = (
+                        complexity_level,
+                        -filtered_records_count,
+                        folder_name,
+                        file_name,
+                    )
+                    if len(top_heap) < complexity_top_n:
+                        heapq.heappush(top_heap, entry)
+                    elif top_heap:
+                        heapq.heappushpop(top_heap, entry)
+
+            total_files += 1
 
     # Print summary of processed files to show progress
     print(f"Total number of JSON files processed: {total_files}")
@@ -106,23 +217,29 @@ def sample_images(
         print_detailed_stats(compliance_levels, "compliance_level")
         print_detailed_stats(complexity_levels, "complexity_level")
 
-    # Sort records by complexity in descending order to get most complex first
-    # This allows us to easily extract the top complex images
-    filtered_records.sort(key=lambda x: x[0], reverse=True)
-    top_n_records = filtered_records[:complexity_top_n]
-
-    # Write indices of top complex images to a text file for further processing
+    # Order the top complex images, most complex first
+    top_n_records = [
+        (complexity_level, folder_name, file_name)
+        for complexity_level, _, folder_name, file_name in sorted(
+            top_heap, reverse=True
+        )
+    ]
+
+    # Build indices of top complex images in format: folder_id-file_id
+    # Folder and file names are zero-padded to 6 digits for consistent formatting.
+    # Many records share a folder, so each padded folder ID is computed once, and
+    # every file name ends in ".json", so the extension is sliced off directly
+    folder_ids = {}
+    index_ids = []
+    for _, folder_name, file_name in top_n_records:
+        folder_id = folder_ids.get(folder_name)
+        if folder_id is None:
+            folder_id = folder_ids[folder_name] = folder_name.zfill(6)
+        index_ids.append((folder_id, file_name[:-5].zfill(6)))
+
+    # Write indices to a text file for further processing with a single write
     with open(output_filename, "w") as f:
-        for _, folder_name, file_name in top_n_records:
-            # Extract base name without extension
-            base_name = os.path.splitext(file_name)[0]
-            # Zero-pad folder name to 6 digits for consistent formatting
-            folder_id = folder_name.zfill(6)
-            # Zero-pad file name to 6 digits for consistent formatting
-            file_id = base_name.zfill(6)
-            # Create index string in format: folder_id-file_id
-            index_str = f"{folder_id}-{file_id}"
-            f.write(index_str + "\n")
+        f.write("".join(f"{folder_id}-{file_id}\n" for folder_id, file_id in index_ids))
 
     print(
         f"\nTop {complexity_top_n} most complex image indices saved to {output_filename}"
@@ -132,96 +249,68 @@ def sample_images(
     print("\nStarting filtering process...")
 
     # Initialize counter for content themes to track sampling limits
-    content_theme_counter = {}
+    # New content themes start at zero on first access
+    content_theme_counter = defaultdict(int)
 
     # Initialize lists and counters for processing statistics
     filtered_lines = []  # Store lines that meet all filtering criteria
     total_processed = 0  # Total number of lines processed from input file
     total_kept = 0  # Total number of lines that passed all filters
 
-    # Process each line in the input text file containing image indices
-    with open(output_filename, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()  # Remove leading/trailing whitespace
-            if not line:  # Skip empty lines to avoid processing errors
+    # Process each top complex image index kept in memory, instead of reading
+    # the indices back from output_filename
+    pending_lines = []  # (line, json_file_path) of files to classify
+    for folder_id, file_id in index_ids:
+        line = f"{folder_id}-{file_id}"
+        total_processed += 1  # Increment counter for processed lines
+
+        # Construct JSON file path using folder ID and file ID
+        # This creates the complete path to the corresponding JSON classification file
+        json_filename = f"{file_id}.json"
+        json_file_path = os.path.join(
+            json_classification_path, folder_id, json_filename
+        )
+        pending_lines.append((line, json_file_path))
+
+    # Parse the classification files in parallel, then apply the per-theme
+    # limits in file order so the sampling result does not depend on timing
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            partial(_parse_classification_file, keep_chart_types=keep_chart_types),
+            [json_file_path for _, json_file_path in pending_lines],
+            chunksize=256,
+        )
+        for (line, json_file_path), (
+            has_valid_chart_type,
+            content_themes,
+            error,
+        ) in zip(pending_lines, results):
+            if error is not None:
+                # Log missing files and errors encountered while processing individual JSON files
+                print(error)
                 continue
 
-            total_processed += 1  # Increment counter for processed lines
-
-            # Parse folder ID and file ID from the formatted line (format: folder_id-file_id)
-            folder_id, file_id = line.split("-")
-
-            # Construct JSON file path using folder ID and file ID
-            # This creates the complete path to the corresponding JSON classification file
-            json_filename = f"{file_id}.json"
-            json_file_path = os.path.join(
-                json_classification_path, folder_id, json_filename
-            )
-
-            # Check if JSON file exists before attempting to read it
-            # Skip processing if file is missing to avoid errors
-            if not os.path.exists(json_file_path):
-                print(f"File not found: {json_file_path}")
-                continue
-
-            try:
-                # Load JSON data from the classification file
-                with open(json_file_path, "r", encoding="utf-8") as json_f:
-                    data = json.load(json_f)
-
-                # Extract chart types and content themes from JSON data
-                # These fields contain the classification information for the image
-                chart_types = data.get("chart_type", [])
-                content_themes = data.get("content_theme", [])
-
-                # Convert chart types and content themes to integers if they are strings or floats
-                # This ensures consistent data type for comparison operations
-                chart_types = [
-                    int(t) if isinstance(t, (str, float)) else t for t in chart_types
-                ]
-                content_themes = [
-                    int(t) if isinstance(t, (str, float)) else t for t in content_themes
-                ]
-
-                # Check if any chart type matches our keep list and content themes exist
-                # Only process if the image has at least one valid chart type and content themes
-                has_valid_chart_type = any(
-                    chart_type in keep_chart_types for chart_type in chart_types
-                )
-
-                # Process line only if it has valid chart type and content themes
-                if has_valid_chart_type and content_themes:
-                    # Check if any content theme is within sampling limit
-                    # We only need one content theme to be within limit for the line to be kept
-                    should_keep_line = False
-                    for content_theme in content_themes:
-                        # Initialize counter for new content theme if not already present
-                        if content_theme not in content_theme_counter:
-                            content_theme_counter[content_theme] = 0
-
-                        # Keep line if content theme count is below the specified limit
-                        # This ensures balanced representation across different content themes
-                        if (
-                            content_theme_counter[content_theme]
-                            < sampling_limit_per_theme
-                        ):
-                            should_keep_line = True
-                            content_theme_counter[content_theme] += 1
-                            break  # One valid theme is sufficient, exit loop early
-
-                    # Add line to filtered results if it meets all criteria
-                    if should_keep_line:
-                        filtered_lines.append(line)
-                        total_kept += 1
-
-            except Exception as e:
-                # Log any errors encountered while processing individual JSON files
-                print(f"Error processing file {json_file_path}: {e}")
+            # Process line only if it has valid chart type and content themes
+            if has_valid_chart_type and content_themes:
+                # Check if any content theme is within sampling limit
+                # We only need one content theme to be within limit for the line to be kept
+                should_keep_line = False
+                for content_theme in content_themes:
+                    # Keep line if content theme count is below the specified limit
+                    # This ensures balanced representation across different content themes
+                    if content_theme_counter[content_theme] < sampling_limit_per_theme:
+                        should_keep_line = True
+                        content_theme_counter[content_theme] += 1
+                        break  # One valid theme is sufficient, exit loop early
+
+                # Add line to filtered results if it meets all criteria
+                if should_keep_line:
+                    filtered_lines.append(line)
+                    total_kept += 1
 
     # Write filtered results to output file, each line representing a valid image index
     with open(filtered_output_filename, "w", encoding="utf-8") as f:
-        for line in filtered_lines:
-            f.write(line + "\n")
+        f.write("".join(f"{line}\n" for line in filtered_lines))
 
     # Print processing statistics to show the filtering results
     print(f"Total lines processed: {total_processed}")
@@ -238,7 +327,7 @@ def sample_images(
         "total_files_processed": total_files,
         "compliance_levels_count": len(compliance_levels),
         "complexity_levels_count": len(complexity_levels),
-        "filtered_records_count": len(filtered_records),
+        "filtered_records_count": filtered_records_count,
         "output_records_count": len(top_n_records),
         "filtered_output_records_count": len(filtered_lines),
         "output_file": output_filename,
@@ -257,24 +346,28 @@ def print_detailed_stats(levels, name):
         print(f"\n=== {name} has no data ===")
         return
 
-    # Count occurrences of each level value
-    counter = Counter(levels)
-    print(f"\n=== Detailed statistics for {name} ===")
-    print(f"Total count: {len(levels)}")
-    print(f"Mean: {statistics.mean(levels):.2f}")
-    print(f"Median: {statistics.median(levels):.2f}")
-    print(f"Min: {min(levels)}")
-    print(f"Max: {max(levels)}")
-    print(
-        f"Standard deviation: "
-        f"{statistics.stdev(levels) if len(levels) > 1 else 0:.2f}"
-    )
+    # Compute the statistics with vectorized NumPy reductions
+    arr = np.asarray(levels)
+    lines = [
+        f"\n=== Detailed statistics for {name} ===",
+        f"Total count: {arr.size}",
+        f"Mean: {arr.mean():.2f}",
+        f"Median: {np.median(arr):.2f}",
+        f"Min: {arr.min()}",
+        f"Max: {arr.max()}",
+        f"Standard deviation: {arr.std(ddof=1) if arr.size > 1 else 0:.2f}",
+        "\nDistribution by level:",
+    ]
 
-    print("\nDistribution by level:")
-    # Print count and percentage for each unique level value
-    for level in sorted(counter.keys()):
-        percentage = (counter[level] / len(levels)) * 100
-        print(f"  Level {level}: {counter[level]} entries ({percentage:.1f}%)")
+    # Count occurrences of each level value
+    values, counts = np.unique(arr, return_counts=True)
+    # Add count and percentage for each unique level value
+    for level, count in zip(values.tolist(), counts.tolist()):
+        percentage = (count / arr.size) * 100
+        lines.append(f"  Level {level}: {count} entries ({percentage:.1f}%)")
+
+    # Emit the whole report with a single print call
+    print("\n".join(lines))
 
 
 # Example usage examples:
@@ -6,20 +6,33 @@ if it meets specific financial chart criteria, and saves the model's JSON
 response to a corresponding output file.
 """
 
+import io
 import re
+import functools
 import os
 import time
-import json
-import base64
+import random
+import sqlite3
+import binascii
+import threading
 from pathlib import Path
+from contextlib import nullcontext
 from collections import defaultdict
-from typing import Optional, Dict, List, Set
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Optional, Dict, List, Set, Tuple, Union
 
 from PIL import Image
 from tqdm import tqdm
-from openai import OpenAI, APIError, RateLimitError
-
+from openai import OpenAI, APIError, InternalServerError, RateLimitError
+
+from fttracer.tools.data_preprocess.file_ops import iter_files, list_file_names
+from fttracer.tools.data_preprocess.json_io import (
+    JSONDecodeError,
+    dump_json,
+    loads_json,
+)
 from fttracer.tools.data_preprocess.prompt import prompt_for_image_screener
+from fttracer.tools.data_preprocess.screener_cache import ScreenerCache
 
 # Constants
 # Define valid image file extensions that the script will process
@@ -29,6 +42,191 @@ VALID_IMAGE_EXTENSIONS = {
     ".png",
 }
 
+# Bytes read per chunk when base64-encoding images; must be a multiple of 3
+ENCODE_CHUNK_SIZE = 3 * 64 * 1024
+
+# Matches a JSON object inside a Markdown code block, with or without a
+# 'json' language specifier; compiled once instead of on every response
+JSON_BLOCK_PATTERN = re.compile(r"```(?:json)?\s*({.*?})\s*```", re.DOTALL)
+
+# API limit on the size of the base64-encoded image, in megabytes
+MAX_ENCODED_SIZE_MB = 10
+
+# Header of the data URL the base64-encoded image is sent in
+DATA_URL_PREFIX = "data:image/jpeg;base64,"
+
+# Number of times a throttled or failed request is retried before giving up
+MAX_REQUEST_RETRIES = 5
+# Upper bound in seconds on the wait between retries when no Retry-After is sent
+MAX_RETRY_DELAY = 60.0
+
+
+class AdaptiveConcurrencyLimiter:
+    """Bounds concurrent API requests with a limit adapted by AIMD.
+
+    The limit grows additively after each successful request and is cut
+    multiplicatively when the server throttles (HTTP 429) or fails (HTTP 5xx),
+    so the number of requests in flight settles near what the server can take.
+    Use an instance as a context manager around each request.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+    ):
+        """Starts the limit at max_limit.
+
+        Args:
+            max_limit: Largest number of requests allowed in flight.
+            min_limit: Smallest number of requests allowed in flight.
+            increase: Amount added to the limit after a successful request.
+            decrease: Factor applied to the limit after a throttled request.
+        """
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.increase = increase
+        self.decrease = decrease
+        self.limit = float(max_limit)
+        self._active = 0
+        self._condition = threading.Condition()
+
+    def __enter__(self):
+        with self._condition:
+            while self._active >= int(self.limit):
+                self._condition.wait()
+            self._active += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._condition:
+            self._active -= 1
+            self._condition.notify()
+        return False
+
+    def on_success(self) -> None:
+        """Raises the limit additively after a successful request."""
+        with self._condition:
+            self.limit = min(self.max_limit, self.limit + self.increase)
+            self._condition.notify_all()
+
+    def on_throttle(self) -> None:
+        """Lowers the limit multiplicatively after a throttled request."""
+        with self._condition:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+
+
+def get_retry_after(error: APIError) -> Optional[float]:
+    """Reads the Retry-After header of a failed API response, in seconds.
+
+    Args:
+        error: Error raised by the OpenAI client.
+
+    Returns:
+        The delay requested by the server, or None if it did not send one.
+    """
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return max(0.0, float(response.headers.get("retry-after")))
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_with_backoff(
+    max_retries: int = MAX_REQUEST_RETRIES,
+    base: float = 1.0,
+    cap: float = MAX_RETRY_DELAY,
+    jitter: bool = True,
+) -> Callable:
+    """Decorator retrying a function when the API throttles or fails.
+
+    Rate limit (HTTP 429) and server (HTTP 5xx) errors are retried. The wait
+    before each retry is the server's Retry-After when it sends one, and
+    otherwise grows exponentially from base up to cap. Other errors, and the
+    last failure, are raised to the caller.
+
+    Args:
+        max_retries: Number of retries after the first attempt.
+        base: Delay in seconds before the first retry.
+        cap: Upper bound in seconds on the exponential delay.
+        jitter: Add a random delay of up to base seconds, so concurrent
+            workers throttled at the same time do not retry in lockstep.
+
+    Returns:
+        The decorator.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            for attempt in range(max_retries + 1):
+                try:
+                    return fn(*args, **kwargs)
+                except (RateLimitError, InternalServerError) as e:
+                    if attempt == max_retries:
+                        raise
+                    # Honour Retry-After, otherwise back off exponentially
+                    delay = get_retry_after(e)
+                    if delay is None:
+                        delay = min(cap, base * 2**attempt)
+                    if jitter:
+                        delay += random.uniform(0, base)
+                    print(
+                        f"Request failed ({e.status_code}), retrying in {delay:.1f}s "
+                        f"(attempt {attempt + 1}/{max_retries})"
+                    )
+                    time.sleep(delay)
+
+        return wrapper
+
+    return decorator
+
+
+@retry_with_backoff()
+def send_chat_request(
+    client: OpenAI,
+    model_name: str,
+    messages: List[Dict],
+    request_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+):
+    """Sends one chat completion request, holding a slot of the limiter.
+
+    Args:
+        client: Configured OpenAI client instance.
+        model_name: The name of the model to use.
+        messages: Chat messages of the request.
+        request_limiter: Optional limiter bounding concurrent API requests. It
+            is told about each success and each throttled attempt.
+
+    Returns:
+        The chat completion returned by the API.
+    """
+    try:
+        with request_limiter or nullcontext():
+            completion = client.chat.completions.create(
+                model=model_name, messages=messages
+            )
+    except (RateLimitError, InternalServerError):
+        # Shrink the concurrency limit so other workers back off too
+        if request_limiter is not None:
+            request_limiter.on_throttle()
+        raise
+    if request_limiter is not None:
+        request_limiter.on_success()
+    return completion
+
+
+def get_file_size(file_path: Path) -> int:
+    """Returns the size of a file in bytes, or 0 if it cannot be read."""
+    try:
+        return os.stat(file_path).st_size
+    except OSError:
+        return 0
+
 
 def get_image_size_mb(image_path: str) -> float:
     """Gets the size of an image file in megabytes.
@@ -39,26 +237,76 @@ def get_image_size_mb(image_path: str) -> float:
     Returns:
         Size of the image file in megabytes.
     """
-    # Get the file size in bytes using os.path.getsize
-    size_bytes = os.path.getsize(image_path)
+    # Get the file size in bytes with a single stat call
+    size_bytes = os.stat(image_path).st_size
     # Convert bytes to megabytes (1 MB = 1024 * 1024 bytes)
     size_mb = size_bytes / (1024 * 1024)
     return size_mb
 
 
+def encode_jpeg(img: Image.Image, quality: int) -> io.BytesIO:
+    """Encodes an image as JPEG into an in-memory buffer.
+
+    The size of each trial encoding is read from the buffer instead of
+    writing it to disk and calling stat on the result.
+
+    Args:
+        img: Image in a JPEG-compatible mode.
+        quality: JPEG compression quality (1-100).
+
+    Returns:
+        Buffer holding the encoded image, positioned at its end.
+    """
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", optimize=True, quality=quality)
+    return buffer
+
+
+def find_first_fitting(
+    candidates: List, encode: Callable[[Any], io.BytesIO], max_size_bytes: float
+) -> Optional[Tuple[Any, io.BytesIO]]:
+    """Binary-searches for the first candidate whose encoding is small enough.
+
+    Candidates must be ordered so that encoded size decreases along the list,
+    e.g. JPEG qualities or scale factors from high to low.
+
+    Args:
+        candidates: Encoding settings ordered from largest to smallest output.
+        encode: Function encoding the image with one candidate setting.
+        max_size_bytes: Exclusive upper bound on the encoded size.
+
+    Returns:
+        Tuple of (candidate, buffer) for the first candidate that fits, or
+        None if none of them does.
+    """
+    best = None
+    lo, hi = 0, len(candidates) - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        buffer = encode(candidates[mid])
+        if buffer.tell() < max_size_bytes:
+            # Fits: remember it and look for an earlier candidate that fits too
+            best = (candidates[mid], buffer)
+            hi = mid - 1
+        else:
+            lo = mid + 1
+    return best
+
+
 def compress_image(
-    input_path: str, output_path: str, max_size_mb: float = 9.0, quality: int = 85
-) -> bool:
+    input_path: str, max_size_mb: float = 9.0, quality: int = 85
+) -> Optional[bytes]:
     """Compresses an image until it is smaller than the specified size.
 
+    The result is kept in memory; nothing is written to disk.
+
     Args:
         input_path: Input image path.
-        output_path: Output image path.
         max_size_mb: Maximum size in megabytes.
         quality: JPEG compression quality (1-100).
 
     Returns:
-        True if compression succeeds, False otherwise.
+        The compressed JPEG data, or None if compression fails.
     """
     try:
         # Open the original image using PIL
@@ -68,89 +316,144 @@ def compress_image(
             if img.mode in ("RGBA", "LA", "P"):
                 img = img.convert("RGB")
 
-            # Gradually reduce quality until size requirement is met
-            current_quality = quality
-            while current_quality > 10:
-                # Save the image with current quality setting
-                img.save(output_path, "JPEG", optimize=True, quality=current_quality)
-                # Check if the compressed image meets the size requirement
-                compressed_size = get_image_size_mb(output_path)
-
-                if compressed_size < max_size_mb:
-                    print(
-                        f"Image compression successful: {compressed_size:.2f}MB (quality: {current_quality})"
-                    )
-                    return True
-
-                # Reduce quality by 5 points for next iteration
-                current_quality -= 5
-
-            # If quality adjustment is insufficient, try resizing
-            if current_quality <= 10:
-                # Get original dimensions
-                width, height = img.size
-                # Start with 90% of original size
-                scale_factor = 0.9
-                while current_quality <= 10 and scale_factor > 0.1:
-                    # Calculate new dimensions based on scale factor
-                    new_width = int(width * scale_factor)
-                    new_height = int(height * scale_factor)
-                    # Resize the image using LANCZOS resampling for high quality
-                    resized_img = img.resize(
-                        (new_width, new_height), Image.Resampling.LANCZOS
-                    )
-                    # Save the resized image with minimum quality
-                    resized_img.save(output_path, "JPEG", optimize=True, quality=10)
-                    # Check if the resized image meets the size requirement
-                    compressed_size = get_image_size_mb(output_path)
-
-                    if compressed_size < max_size_mb:
-                        print(
-                            f"Image compression successful (resized): {compressed_size:.2f}MB (scale: {scale_factor})"
+            max_size_bytes = max_size_mb * 1024 * 1024
+
+            # Encode once at the starting quality; this is often enough
+            best = None
+            buffer = encode_jpeg(img, quality)
+            if buffer.tell() < max_size_bytes:
+                best = (quality, buffer)
+            else:
+                # Output size roughly scales with quality, so predict the
+                # quality that fits from the first size (with a 5% margin)
+                # and jump straight to it on the 5-step quality grid. The
+                # prediction is clamped to the lowest grid quality so that
+                # low qualities at full resolution are tried before resizing.
+                grid = range(quality - 5, 10, -5)
+                predicted = int(quality * max_size_bytes / buffer.tell() * 0.95)
+                if grid:
+                    predicted = max(predicted, grid[-1])
+                qualities = [q for q in grid if q <= predicted]
+                if qualities:
+                    buffer = encode_jpeg(img, qualities[0])
+                    if buffer.tell() < max_size_bytes:
+                        best = (qualities[0], buffer)
+                    else:
+                        # Prediction was too optimistic: binary-search the
+                        # lower qualities, output size decreasing with quality
+                        best = find_first_fitting(
+                            qualities[1:], lambda q: encode_jpeg(img, q), max_size_bytes
                         )
-                        return True
-
-                    # Reduce scale factor by 10% for next iteration
-                    scale_factor -= 0.1
+            if best is not None:
+                current_quality, buffer = best
+                compressed_size = buffer.tell() / (1024 * 1024)
+                print(
+                    f"Image compression successful: {compressed_size:.2f}MB (quality: {current_quality})"
+                )
+                return buffer.getvalue()
+
+            # If quality adjustment is insufficient, find the largest scale, in
+            # steps of 10%, at which the resized image meets the requirement
+            width, height = img.size
+            scale_factors = [round(0.9 - 0.1 * i, 1) for i in range(8)]
+
+            def encode_resized(scale_factor: float) -> io.BytesIO:
+                # Calculate new dimensions based on scale factor
+                new_size = (int(width * scale_factor), int(height * scale_factor))
+                # Resize the image using LANCZOS resampling for high quality
+                resized_img = img.resize(new_size, Image.Resampling.LANCZOS)
+                # Encode the resized image in memory with minimum quality
+                return encode_jpeg(resized_img, 10)
+
+            best = find_first_fitting(scale_factors, encode_resized, max_size_bytes)
+            if best is not None:
+                scale_factor, buffer = best
+                compressed_size = buffer.tell() / (1024 * 1024)
+                print(
+                    f"Image compression successful (resized): {compressed_size:.2f}MB (scale: {scale_factor})"
+                )
+                return buffer.getvalue()
 
             print(
                 f"Image compression failed: Cannot compress image below {max_size_mb}MB"
             )
-            return False
+            return None
 
     except Exception as e:
         print(f"Error during image compression: {e}")
-        return False
+        return None
 
 
-def encode_image(image_path: str) -> str:
+def encode_image(image_path: str, prefix: str = "") -> str:
     """Encodes an image to base64 string.
 
+    The file is read and encoded in chunks straight into a buffer sized for
+    the final result, so the raw image is never held in memory as a whole
+    next to its encoded copy.
+
     Args:
         image_path: Path to the image file.
+        prefix: ASCII text placed in front of the encoded data, e.g. the
+            header of a data URL.
 
     Returns:
-        Base64 encoded string of the image.
+        Base64 encoded string of the image, preceded by prefix.
     """
     # Open the image file in binary read mode
     with open(image_path, "rb") as image_file:
-        # Read the binary content and encode it to base64 string
-        return base64.b64encode(image_file.read()).decode("utf-8")
+        # Base64 turns every 3 input bytes into 4 output characters
+        size = os.fstat(image_file.fileno()).st_size
+        buffer = bytearray(len(prefix) + 4 * ((size + 2) // 3))
+        buffer[: len(prefix)] = prefix.encode("ascii")
+        position = len(prefix)
+        # Chunks are a multiple of 3 bytes so no padding appears mid-stream
+        while chunk := image_file.read(ENCODE_CHUNK_SIZE):
+            encoded = binascii.b2a_base64(chunk, newline=False)
+            buffer[position : position + len(encoded)] = encoded
+            position += len(encoded)
+        # Trim in case the file shrank while it was being read
+        del buffer[position:]
+    return buffer.decode("ascii")
+
+
+def encode_image_data(image_data: bytes, prefix: str = "") -> str:
+    """Encodes in-memory image data to base64 string.
+
+    Args:
+        image_data: Encoded image file content.
+        prefix: ASCII text placed in front of the encoded data, e.g. the
+            header of a data URL.
+
+    Returns:
+        Base64 encoded string of the image, preceded by prefix.
+    """
+    return prefix + binascii.b2a_base64(image_data, newline=False).decode("ascii")
 
 
-def prepare_image_for_model(image_path: Path, max_size_mb: float = 9.0) -> str:
+def prepare_image_for_model(
+    image_path: Path, max_size_mb: float = 9.0
+) -> Union[str, bytes]:
     """Prepares an image for model inference, compressing if necessary.
 
+    The size limit is tightened so that the base64 encoding of the result also
+    stays below MAX_ENCODED_SIZE_MB, which is known from the file size alone.
+
     Args:
         image_path: Path to the image file.
         max_size_mb: Maximum allowed size in megabytes.
 
     Returns:
-        Path to the processed image.
+        Path to the original image if it is small enough, otherwise the
+        compressed JPEG data.
 
     Raises:
         Exception: If image cannot be compressed to required size.
     """
+    # Base64 output is exactly 4 * ceil(n / 3) bytes, so images of at most
+    # this many megabytes encode to less than MAX_ENCODED_SIZE_MB
+    max_encodable_mb = 3 * (MAX_ENCODED_SIZE_MB * 1024 * 1024 // 4 - 1) / (1024 * 1024)
+    max_size_mb = min(max_size_mb, max_encodable_mb)
+
     # Get the original image size in MB
     original_size = get_image_size_mb(str(image_path))
 
@@ -159,20 +462,25 @@ def prepare_image_for_model(image_path: Path, max_size_mb: float = 9.0) -> str:
         return str(image_path)
 
     # Image needs compression
-    print(f"Image too large ({original_size:.2f}MB > {max_size_mb}MB), compressing...")
+    print(
+        f"Image too large ({original_size:.2f}MB > {max_size_mb:.2f}MB), compressing..."
+    )
 
-    # Create temporary compressed file path by inserting "_compressed" before extension
-    temp_compressed_path = str(image_path).replace(".", "_compressed.")
-    # Attempt to compress the image
-    if not compress_image(str(image_path), temp_compressed_path, max_size_mb):
+    # Attempt to compress the image in memory
+    compressed_data = compress_image(str(image_path), max_size_mb)
+    if compressed_data is None:
         # Raise exception if compression fails to meet size requirements
-        raise Exception(f"Cannot compress image below {max_size_mb}MB")
+        raise Exception(f"Cannot compress image below {max_size_mb:.2f}MB")
 
-    return temp_compressed_path
+    return compressed_data
 
 
 def evaluate_image_with_model(
-    image_path: Path, client: OpenAI, model_name: str, prompt_text: str
+    image_path: Path,
+    client: OpenAI,
+    model_name: str,
+    prompt_text: str,
+    request_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
 ) -> Optional[str]:
     """Sends an image to the Qwen-VL model and retrieves the response.
 
@@ -181,62 +489,53 @@ def evaluate_image_with_model(
         client: Configured OpenAI client instance.
         model_name: The name of the Qwen-VL model to use.
         prompt_text: The text prompt to send with the image.
+        request_limiter: Optional limiter held while the API request is in
+            flight, bounding the number of simultaneous requests.
 
     Returns:
         The model's response content as a string, or None if an error occurred.
     """
     try:
         # Check and prepare image - compress if necessary to meet size limits
-        processed_image_path = prepare_image_for_model(image_path)
+        processed_image = prepare_image_for_model(image_path)
 
-        # Encode the processed image to base64 for API transmission
-        base64_image = encode_image(processed_image_path)
+        # Encode the processed image to a base64 data URL for API transmission;
+        # compressed images are encoded straight from memory
+        if isinstance(processed_image, bytes):
+            image_url = encode_image_data(processed_image, prefix=DATA_URL_PREFIX)
+        else:
+            image_url = encode_image(processed_image, prefix=DATA_URL_PREFIX)
 
-        # Check encoded data size to ensure it's within API limits
-        encoded_size_mb = len(base64_image) / (1024 * 1024)
+        # The encoded size is below the API limit by construction of the
+        # size limit in prepare_image_for_model
+        encoded_size_mb = (len(image_url) - len(DATA_URL_PREFIX)) / (1024 * 1024)
         print(f"Base64 encoded size: {encoded_size_mb:.2f}MB")
 
-        # Verify encoded size doesn't exceed 10MB limit
-        if encoded_size_mb >= 10:
-            raise Exception(
-                f"Encoded image size {encoded_size_mb:.2f}MB exceeds 10MB limit"
-            )
-
-        # Create the API request to the Qwen-VL model
-        completion = client.chat.completions.create(
-            model=model_name,
-            messages=[
-                {
-                    "role": "system",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": "You are a financial image understanding expert, and you are now tasked with performing a financial image evaluation.",
-                        }
-                    ],
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{base64_image}"
-                            },
-                        },
-                        {"type": "text", "text": prompt_text},
-                    ],
-                },
-            ],
-        )
-
-        # Clean up temporary compressed file if it was created during processing
-        if processed_image_path != str(image_path):
-            try:
-                os.remove(processed_image_path)
-                print("Temporary compressed file cleaned up")
-            except:
-                pass
+        # Build the chat messages for the Qwen-VL model
+        messages = [
+            {
+                "role": "system",
+                "content": [
+                    {
+                        "type": "text",
+                        "text": "You are a financial image understanding expert, and you are now tasked with performing a financial image evaluation.",
+                    }
+                ],
+            },
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "image_url",
+                        "image_url": {"url": image_url},
+                    },
+                    {"type": "text", "text": prompt_text},
+                ],
+            },
+        ]
+
+        # Create the API request, retrying when the server throttles or fails
+        completion = send_chat_request(client, model_name, messages, request_limiter)
 
         # Extract and return the model's response content
         response_content = completion.choices[0].message.content
@@ -263,7 +562,7 @@ def extract_json_from_response(response_text):
         return None
 
     # Use regex to extract content from JSON code blocks (with or without 'json' language specifier)
-    json_match = re.search(r"```(?:json)?\s*({.*?})\s*```", response_text, re.DOTALL)
+    json_match = JSON_BLOCK_PATTERN.search(response_text)
     if json_match:
         # Return the extracted JSON string
         return json_match.group(1)
@@ -279,13 +578,140 @@ def extract_json_from_response(response_text):
     return response_text
 
 
-def screen_image(input_dir: str) -> None:
+def write_default_response(output_file_path: Path, image_file: Path) -> None:
+    """Writes the placeholder result used when an image could not be evaluated.
+
+    Args:
+        output_file_path: Path of the JSON file to write.
+        image_file: Path of the image the result belongs to, used in messages.
+    """
+    # Create a default response when the model fails or returns invalid JSON
+    default_response = {
+        "is_compliant": "null",
+        "compliance_level": -1,
+        "complexity_level": -1,
+    }
+    try:
+        # Write the default response to the output file
+        dump_json(default_response, output_file_path, atomic=True)
+    except IOError as io_error:
+        # Handle errors in writing the default response
+        print(f"Failed to write default response for {image_file}: {io_error}")
+
+
+def process_image(
+    image_file: Path,
+    images_search_root: Path,
+    evaluation_output_root: Path,
+    client: OpenAI,
+    model_name: str,
+    prompt_text: str,
+    request_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    cache: Optional[ScreenerCache] = None,
+) -> bool:
+    """Evaluates a single image and saves the model's response.
+
+    Runs on a worker thread of screen_image, so several images can wait on
+    the API at the same time.
+
+    Args:
+        image_file: Path of the image to evaluate.
+        images_search_root: Root of the images directory tree.
+        evaluation_output_root: Root of the evaluation output directory tree.
+        client: Configured OpenAI client instance.
+        model_name: The name of the Qwen-VL model to use.
+        prompt_text: The text prompt to send with the image.
+        request_limiter: Optional limiter bounding concurrent API requests.
+        cache: Optional cache of responses from previous runs. Cached images
+            are not sent to the model again.
+
+    Returns:
+        True if the model's response was saved, False otherwise.
+    """
+    # Calculate the relative path from images root for the current image
+    try:
+        relative_path_from_images = image_file.relative_to(images_search_root)
+    except ValueError as e:
+        # Handle errors in calculating relative path
+        print(f"Error calculating relative path for {image_file}: {e}")
+        return False
+
+    # Calculate the output file path for the current image
+    output_file_path = (evaluation_output_root / relative_path_from_images).with_name(
+        f"{relative_path_from_images.stem}.json"
+    )
+
+    # Create the parent directory for the output file if it doesn't exist
+    try:
+        output_file_path.parent.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        # Handle errors in creating parent directories
+        print(
+            f"Failed to create parent directory for output file '{output_file_path}': {e}"
+        )
+        return False
+
+    # Reuse the response of a previous run if this image was screened before
+    hit, model_response = False, None
+    if cache is not None:
+        try:
+            hit, model_response = cache.get(str(image_file))
+        except (OSError, sqlite3.Error) as e:
+            print(f"Cache lookup failed for {image_file}: {e}")
+
+    # Send the image to the model for evaluation
+    if not hit:
+        model_response = evaluate_image_with_model(
+            image_file, client, model_name, prompt_text, request_limiter
+        )
+    # Print raw model response for debugging (commented out by default)
+    # print(f"Raw model response for {image_file}: {repr(model_response)}")
+
+    # Check if the model returned a valid response
+    if not model_response:
+        # Handle cases where the model didn't return a valid response
+        print(f"Failed to get a valid response for {image_file}")
+        print(f"Response content: {repr(model_response)}")
+        write_default_response(output_file_path, image_file)
+        return False
+
+    try:
+        # Extract clean JSON from the model response (handles code blocks)
+        clean_json_str = extract_json_from_response(model_response)
+        # Parse the JSON response and save it with proper formatting
+        response_data = loads_json(clean_json_str)
+        dump_json(response_data, output_file_path, atomic=True)
+    except (JSONDecodeError, TypeError, IOError) as e:
+        # Handle errors in parsing, serializing or writing the JSON
+        print(
+            f"Failed to process JSON response for {image_file} to {output_file_path}: {e}"
+        )
+        write_default_response(output_file_path, image_file)
+        return False
+
+    # Remember the usable response so later runs can skip the API call
+    if cache is not None and not hit:
+        try:
+            cache.put(str(image_file), model_response)
+        except (OSError, sqlite3.Error) as e:
+            print(f"Failed to cache response for {image_file}: {e}")
+    return True
+
+
+def screen_image(input_dir: str, max_workers: int = 8, use_cache: bool = True) -> None:
     """Main function to orchestrate the image evaluation process.
 
     Recursively searches for images within an 'images' subdirectory of input_dir.
     Saves evaluation results in a parallel 'images_eval' directory structure.
-    Skips directories where all outputs already exist.
+    Skips images whose output already exists.
     Shows progress with a progress bar.
+
+    Args:
+        input_dir: Directory containing the 'images' subdirectory.
+        max_workers: Maximum number of images evaluated concurrently.
+        use_cache: Reuse model responses cached for unchanged images in
+            previous runs with the same model and prompt instead of calling
+            the API again.
     """
     # Get the API key from environment variables
     api_key = os.getenv("DASHSCOPE_API_KEY")
@@ -332,10 +758,13 @@ def screen_image(input_dir: str) -> None:
         return
 
     # Step 1: Collect all valid image files from the images directory and subdirectories
+    # os.scandir gives file types without a stat call per entry, and Path
+    # objects are only created for the matching image files
     image_files = [
-        f
-        for f in images_search_root.rglob("*")
-        if f.is_file() and f.suffix.lower() in VALID_IMAGE_EXTENSIONS
+        Path(f)
+        for f in iter_files(
+            str(images_search_root), tuple(VALID_IMAGE_EXTENSIONS), ignore_case=True
+        )
     ]
 
     # Exit if no valid image files were found
@@ -361,29 +790,37 @@ def screen_image(input_dir: str) -> None:
     dirs_to_process: Dict[Path, List[Path]] = {}
 
     for relative_dir, images_in_dir in dir_to_images.items():
+        # List the existing outputs of this directory with a single scan
+        # instead of checking every output file separately
+        output_dir = evaluation_output_root / relative_dir
+        existing_names = list_file_names(str(output_dir))
         # Track which output files already exist
         output_files_exist: Set[Path] = set()
         # Track which output files are needed
         output_files_needed: List[Path] = []
 
         for image_file in images_in_dir:
-            # Calculate the relative path from images root to maintain directory structure
-            relative_path = image_file.relative_to(images_search_root)
-            # Create the corresponding output file path (JSON instead of image)
-            output_path = (evaluation_output_root / relative_path).with_name(
-                f"{relative_path.stem}.json"
-            )
+            # Create the corresponding output file path (JSON instead of image),
+            # keeping the directory structure of the images root
+            output_name = f"{image_file.stem}.json"
+            output_path = output_dir / output_name
             output_files_needed.append(output_path)
             # Check if the output file already exists
-            if output_path.exists():
+            if output_name in existing_names:
                 output_files_exist.add(output_path)
 
         # If not all outputs exist, we need to process this directory
         if len(output_files_exist) != len(output_files_needed):
-            # Add this directory to the list of directories to process
-            dirs_to_process[relative_dir] = images_in_dir
-            # Add the number of images in this directory to the total count
-            total_images += len(images_in_dir)
+            # Add this directory to the list of directories to process, keeping
+            # only the images whose output is missing so existing results are
+            # not requested and overwritten again
+            dirs_to_process[relative_dir] = [
+                image_file
+                for image_file, output_path in zip(images_in_dir, output_files_needed)
+                if output_path not in output_files_exist
+            ]
+            # Add the number of images to process in this directory to the total
+            total_images += len(dirs_to_process[relative_dir])
         else:
             # All outputs exist for this directory, skip it
             print(
@@ -395,112 +832,63 @@ def screen_image(input_dir: str) -> None:
         print("All directories already fully processed.")
         return
 
-    # Step 4: Process images with progress bar to show processing status
+    # Step 4: Process images concurrently with a progress bar to show status
     processed_count = 0  # Count of successfully processed images
     error_count = 0  # Count of images that failed to process
     start_time = time.time()  # Record start time for performance tracking
 
-    # Create a progress bar with tqdm to show processing progress
-    with tqdm(total=total_images, desc="Processing Images", unit="img") as pbar:
-        # Iterate through each directory that needs processing
-        for relative_dir, images_in_dir in dirs_to_process.items():
-            # Process each image in the current directory
-            for image_file in images_in_dir:
-                # Calculate the relative path from images root for the current image
-                try:
-                    relative_path_from_images = image_file.relative_to(
-                        images_search_root
-                    )
-                except ValueError as e:
-                    # Handle errors in calculating relative path
-                    print(f"Error calculating relative path for {image_file}: {e}")
-                    error_count += 1
-                    pbar.update(1)
-                    continue
-
-                # Calculate the output file path for the current image
-                output_file_path = (
-                    evaluation_output_root / relative_path_from_images
-                ).with_name(f"{relative_path_from_images.stem}.json")
-
-                # Create the parent directory for the output file if it doesn't exist
-                try:
-                    output_file_path.parent.mkdir(parents=True, exist_ok=True)
-                except OSError as e:
-                    # Handle errors in creating parent directories
-                    print(
-                        f"Failed to create parent directory for output file '{output_file_path}': {e}"
-                    )
-                    error_count += 1
-                    pbar.update(1)
-                    continue
+    # Bound the number of requests in flight so the API quota is not exceeded;
+    # the bound shrinks while the server throttles and recovers afterwards
+    request_limiter = AdaptiveConcurrencyLimiter(max_workers)
+
+    # Open the response cache shared by all worker threads
+    cache = None
+    if use_cache:
+        cache = ScreenerCache(
+            str(input_path_obj / ".cache" / "image_screener.sqlite"),
+            model_name,
+            prompt_text,
+        )
 
-                # Send the image to the model for evaluation
-                model_response = evaluate_image_with_model(
-                    image_file, client, model_name, prompt_text
-                )
-                # Print raw model response for debugging (commented out by default)
-                # print(f"Raw model response for {image_file}: {repr(model_response)}")
-
-                # Check if the model returned a valid response
-                if model_response:
-                    try:
-                        # Extract clean JSON from the model response (handles code blocks)
-                        clean_json_str = extract_json_from_response(model_response)
-                        # Parse the JSON response and save it with proper formatting
-                        response_data = json.loads(model_response)
-                        with open(output_file_path, "w", encoding="utf-8") as f:
-                            json.dump(response_data, f, ensure_ascii=False, indent=2)
-                        processed_count += 1
-                    except (json.JSONDecodeError, IOError) as e:
-                        # Handle errors in parsing JSON or writing to file
-                        print(
-                            f"Failed to process JSON response for {image_file} to {output_file_path}: {e}"
-                        )
-                        # Create a default response in case of JSON parsing errors
-                        default_response = {
-                            "is_compliant": "null",
-                            "compliance_level": -1,
-                            "complexity_level": -1,
-                        }
-                        try:
-                            # Write the default response to the output file
-                            with open(output_file_path, "w", encoding="utf-8") as f:
-                                json.dump(
-                                    default_response, f, ensure_ascii=False, indent=2
-                                )
-                        except IOError as io_error:
-                            # Handle errors in writing the default response
-                            print(
-                                f"Failed to write default response for {image_file}: {io_error}"
-                            )
-                        error_count += 1
-                else:
-                    # Handle cases where the model didn't return a valid response
-                    print(f"Failed to get a valid response for {image_file}")
-                    print(f"Response content: {repr(model_response)}")
-                    # Create a default response when model fails
-                    default_response = {
-                        "is_compliant": "null",
-                        "compliance_level": -1,
-                        "complexity_level": -1,
-                    }
-                    try:
-                        # Write the default response to the output file
-                        with open(output_file_path, "w", encoding="utf-8") as f:
-                            json.dump(default_response, f, ensure_ascii=False, indent=2)
-                    except IOError as io_error:
-                        # Handle errors in writing the default response
-                        print(
-                            f"Failed to write default response for {image_file}: {io_error}"
-                        )
-                    error_count += 1
+    # Create a progress bar with tqdm to show processing progress
+    with tqdm(
+        total=total_images, desc="Processing Images", unit="img"
+    ) as pbar, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Submit the largest images first: they take longest to compress,
+        # encode and upload, and starting them early keeps the tail short
+        images_to_process = sorted(
+            (image for images in dirs_to_process.values() for image in images),
+            key=get_file_size,
+            reverse=True,
+        )
+        futures = {}
+        for image_file in images_to_process:
+            future = executor.submit(
+                process_image,
+                image_file,
+                images_search_root,
+                evaluation_output_root,
+                client,
+                model_name,
+                prompt_text,
+                request_limiter,
+                cache,
+            )
+            futures[future] = image_file
 
-                # Update the progress bar
-                pbar.update(1)
+        # Update the counters as each image finishes, in completion order
+        for future in as_completed(futures):
+            if future.result():
+                processed_count += 1
+            else:
+                error_count += 1
+            pbar.update(1)
 
     # Print final processing statistics
     print(f"\nProcessing complete. Processed: {processed_count}, Errors: {error_count}")
+    if cache is not None:
+        print(f"Cached responses reused: {cache.hits}, API calls: {cache.misses}")
+        cache.close()
     end_time = time.time()
     # Print total processing time
     print(f"Total time: {end_time - start_time:.2f}s")
@@ -1,38 +1,169 @@
 """Script to Check Image Requirement Compliance using Async Batch Processing."""
 
+import io
 import os
 import re
 import sys
-import json
-import base64
 import asyncio
 import argparse
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, List, Any, Set, Tuple
 
 from PIL import Image
 from tqdm import tqdm
 from volcenginesdkarkruntime import AsyncArk
 
+# pybase64 provides SIMD (SSSE3/AVX2/NEON) base64 codecs with the same API as
+# the standard library module
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# cykooz.resizer wraps the SIMD (SSE4.1/AVX2/NEON) kernels of the Rust
+# fast_image_resize crate; the package was renamed to cykooz_resizer in 4.0
+try:
+    import cykooz_resizer
+except ImportError:
+    try:
+        import cykooz.resizer as cykooz_resizer
+    except ImportError:
+        cykooz_resizer = None
+
+from fttracer.tools.data_preprocess.file_ops import list_file_names
+from fttracer.tools.data_preprocess.json_io import (
+    JSONDecodeError,
+    dump_json,
+    loads_json,
+)
 from fttracer.tools.data_preprocess.prompt import prompt_for_image_screener
 
 # Define valid image extensions for processing
 # These are the only file types that will be considered as valid images
 VALID_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
 
+# Matches a JSON object inside a Markdown code block (```json or ``` without
+# language); compiled once instead of on every response
+JSON_BLOCK_PATTERN = re.compile(r"```(?:json)?\s*({.*?})\s*```", re.DOTALL)
+
+# Header of the data URL the base64-encoded image is sent in
+DATA_URL_PREFIX = b"data:image/jpeg;base64,"
+
+# Lowest quality tried at full resolution before falling back to resizing
+MIN_QUALITY = 15
+
+# Image modes the SIMD resizer handles without converting the image first
+SIMD_RESIZE_MODES = {"RGB", "RGBA", "L"}
+
+# Smallest scale factor resized with a bilinear instead of a Lanczos3 filter
+BILINEAR_MIN_SCALE = 0.5
+
+# Resizer instance of this process, created on first use
+_resizer = None
+
+# Folder next to the images where compressed versions are cached
+COMPRESSED_CACHE_DIR = ".compressed"
 
-def get_image_size_mb(image_path: str) -> float:
-    """Gets the size of an image file in megabytes.
+# Output directories already created by this process
+_created_dirs = set()
+
+# Screening prompt shared by every request; it does not depend on the image,
+# so it is built once per process instead of once per image
+SCREENER_PROMPT = prompt_for_image_screener()
+
+
+def resize_image(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """Resizes an image with a bilinear or Lanczos3 filter.
+
+    Uses the SIMD resizer from ``cykooz.resizer`` when it is installed, which
+    is several times faster than Pillow on large images, and Pillow otherwise.
+    Scales of at least BILINEAR_MIN_SCALE use the much cheaper bilinear
+    filter, which looks the same as Lanczos3 at such mild reductions once the
+    result is saved at low JPEG quality.
 
     Args:
-        image_path: Path to the image file
+        img: Image to resize
+        size: Target (width, height) in pixels
 
     Returns:
-        Size of the image in megabytes as a float
+        The resized image
     """
-    size_bytes = os.path.getsize(image_path)
-    size_mb = size_bytes / (1024 * 1024)  # Convert bytes to megabytes
-    return size_mb
+    use_bilinear = size[0] >= img.width * BILINEAR_MIN_SCALE
+
+    if cykooz_resizer is None or img.mode not in SIMD_RESIZE_MODES:
+        resample = (
+            Image.Resampling.BILINEAR if use_bilinear else Image.Resampling.LANCZOS
+        )
+        return img.resize(size, resample)
+
+    global _resizer
+    if _resizer is None:
+        # The resizer picks the best CPU extensions available at runtime
+        _resizer = cykooz_resizer.Resizer()
+    resized_img = Image.new(img.mode, size)
+    _resizer.resize_pil(
+        img,
+        resized_img,
+        cykooz_resizer.ResizeOptions(
+            resize_alg=cykooz_resizer.ResizeAlg.convolution(
+                cykooz_resizer.FilterType.bilinear
+                if use_bilinear
+                else cykooz_resizer.FilterType.lanczos3
+            )
+        ),
+    )
+    return resized_img
+
+
+def open_draft(input_path: str, size: Tuple[int, int]) -> Image.Image:
+    """Decodes a JPEG at a reduced resolution of at least the given size.
+
+    JPEG can be decoded at 1/2, 1/4 or 1/8 scale straight from the DCT
+    coefficients, which skips most of the decoding work and memory of a full
+    resolution decode. Other formats are decoded at full resolution.
+
+    Args:
+        input_path: Path to the image file
+        size: Smallest (width, height) in pixels the decoded image may have
+
+    Returns:
+        The decoded image
+    """
+    with Image.open(input_path) as img:
+        img.draft(img.mode, size)  # No-op for formats other than JPEG
+        img.load()
+    return img
+
+
+def encode_jpeg(img: Image.Image, quality: int) -> io.BytesIO:
+    """Encodes an image as JPEG into an in-memory buffer.
+
+    Args:
+        img: Image in a JPEG-compatible mode
+        quality: JPEG quality setting (1-100)
+
+    Returns:
+        Buffer holding the encoded image, positioned at its end
+    """
+    buffer = io.BytesIO()
+    img.save(buffer, "JPEG", optimize=True, quality=quality)
+    return buffer
+
+
+def write_buffer(buffer: io.BytesIO, output_path: str) -> bool:
+    """Writes an encoded image buffer to disk.
+
+    Args:
+        buffer: Buffer holding the encoded image
+        output_path: Path where the image will be saved
+
+    Returns:
+        True, so compress_image can return the result directly
+    """
+    with open(output_path, "wb") as f:
+        f.write(buffer.getbuffer())
+    return True
 
 
 def compress_image(
@@ -41,7 +172,12 @@ def compress_image(
     """Compresses an image until it is smaller than the specified size.
 
     This function attempts to compress an image by reducing quality first,
-    then by resizing if quality reduction is insufficient.
+    then by resizing if quality reduction is insufficient. Instead of stepping
+    down through every setting, the quality and scale that fit are predicted
+    from the size of the previous encoding, so an oversized image typically
+    takes two to four encodes. Encodings are sized in memory and only the one
+    that fits is written to disk. When a JPEG must be shrunk to half its
+    size or less, it is decoded again at a reduced scale before resizing.
 
     Args:
         input_path: Path to the original image file
@@ -55,72 +191,77 @@ def compress_image(
     try:
         # Open the image file
         with Image.open(input_path) as img:
+            is_jpeg = img.format == "JPEG"
+
             # Convert images with transparency or palette modes to RGB for JPEG compatibility
             if img.mode in ("RGBA", "LA", "P"):
                 img = img.convert("RGB")
 
-            # First attempt: reduce quality to meet size requirements
-            current_quality = quality
-            while current_quality > 10:
-                # Save with current quality setting
-                img.save(output_path, "JPEG", optimize=True, quality=current_quality)
-                compressed_size = get_image_size_mb(output_path)
+            max_size_bytes = max_size_mb * 1024 * 1024
 
-                # Check if size is within limit
-                if compressed_size < max_size_mb:
-                    return True
-                current_quality -= 5  # Reduce quality further
+            # First attempt: encode in memory at the initial quality
+            buffer = encode_jpeg(img, quality)
+            if buffer.tell() < max_size_bytes:
+                return write_buffer(buffer, output_path)
 
-            # If quality reduction isn't sufficient, resize the image
+            # JPEG size scales roughly with a power of the quality, so predict
+            # the quality that fits from the first size and verify it once
+            ratio = max_size_bytes / buffer.tell()
+            predicted_quality = max(MIN_QUALITY, int(quality * ratio**0.7))
+            buffer = encode_jpeg(img, predicted_quality)
+            if buffer.tell() < max_size_bytes:
+                return write_buffer(buffer, output_path)
+
+            # If quality reduction isn't sufficient, resize the image at minimum
+            # quality. Size scales with pixel count, i.e. with the square of
+            # the scale factor, so estimate the scale from the last size.
             width, height = img.size
-            scale_factor = 0.9  # Start with 90% of original size
-            while current_quality <= 10 and scale_factor > 0.1:
+            buffer = encode_jpeg(img, 10)
+            scale_factor = 1.0
+            source_img = img  # Image the resized versions are computed from
+            while buffer.tell() >= max_size_bytes:
+                scale_factor *= min(0.9, (max_size_bytes / buffer.tell()) ** 0.5 * 0.95)
+                if scale_factor <= 0.1:
+                    return False  # Compression failed to meet size requirements
+
                 # Calculate new dimensions
-                new_width = int(width * scale_factor)
-                new_height = int(height * scale_factor)
+                new_width = max(1, int(width * scale_factor))
+                new_height = max(1, int(height * scale_factor))
 
-                # Resize image using high-quality resampling
-                resized_img = img.resize(
-                    (new_width, new_height), Image.Resampling.LANCZOS
-                )
+                # Resize from a reduced-scale decode once the target is small
+                # enough for one; later, smaller targets keep reusing it
+                if is_jpeg and source_img is img and scale_factor <= 0.5:
+                    source_img = open_draft(input_path, (new_width, new_height))
 
-                # Save resized image with minimum quality
-                resized_img.save(output_path, "JPEG", optimize=True, quality=10)
-                compressed_size = get_image_size_mb(output_path)
+                # Resize image using high-quality resampling
+                resized_img = resize_image(source_img, (new_width, new_height))
 
-                # Check if size is within limit
-                if compressed_size < max_size_mb:
-                    return True
-                scale_factor -= 0.1  # Reduce size further
+                # Encode resized image with minimum quality
+                buffer = encode_jpeg(resized_img, 10)
 
-            return False  # Compression failed to meet size requirements
+            return write_buffer(buffer, output_path)
 
     except Exception as e:
         print(f"Error during image compression: {e}")
         return False
 
 
-def encode_image(image_path: str) -> str:
-    """Encodes an image to base64 string for API transmission.
-
-    Args:
-        image_path: Path to the image file to encode
-
-    Returns:
-        Base64 encoded string of the image data
-    """
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode("utf-8")
-
-
-def check_image(image_path: Path, max_size_mb: float = 9.0) -> str:
+def check_image(
+    image_path: Path, max_size_mb: float = 9.0, cache_dir: Optional[Path] = None
+) -> str:
     """Prepares an image for model inference, compressing if necessary.
 
     This function checks if the image exceeds size limits and compresses it if needed.
+    Compressed images are kept in a cache directory under a name derived from
+    the size limit and the source's modification time, so reruns reuse them
+    until the source changes.
 
     Args:
         image_path: Path to the original image
         max_size_mb: Maximum allowed file size in megabytes
+        cache_dir: Directory for compressed images (default: a hidden
+            COMPRESSED_CACHE_DIR folder next to the image, which
+            get_all_images skips)
 
     Returns:
         Path to the prepared image (original or compressed)
@@ -128,20 +269,63 @@ def check_image(image_path: Path, max_size_mb: float = 9.0) -> str:
     Raises:
         Exception: If image cannot be compressed below the size limit
     """
-    original_size = get_image_size_mb(str(image_path))
+    # Stat once for both the size check and the cache key
+    stat = os.stat(image_path)
+    original_size = stat.st_size / (1024 * 1024)
 
     # If image is already within size limits, return original path
     if original_size <= max_size_mb:
         return str(image_path)
 
-    # Create path for compressed version
-    temp_compressed_path = str(image_path).replace(".", "_compressed.")
-
-    # Attempt compression
-    if not compress_image(str(image_path), temp_compressed_path, max_size_mb):
+    # Reuse the compressed version of an unchanged image
+    if cache_dir is None:
+        cache_dir = image_path.parent / COMPRESSED_CACHE_DIR
+    compressed_path = (
+        cache_dir
+        / f"{image_path.stem}.q{int(max_size_mb * 10)}.mt{stat.st_mtime_ns}.jpg"
+    )
+    if compressed_path.is_file():
+        return str(compressed_path)
+
+    # Attempt compression into a temporary file, so an interrupted run never
+    # leaves a truncated image in the cache
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    temp_path = compressed_path.with_name(f"{compressed_path.name}.{os.getpid()}.tmp")
+    if not compress_image(str(image_path), str(temp_path), max_size_mb):
+        temp_path.unlink(missing_ok=True)
         raise Exception(f"Cannot compress image below {max_size_mb}MB")
+    os.replace(temp_path, compressed_path)
+
+    return str(compressed_path)
+
 
-    return temp_compressed_path
+def read_image(
+    image_path: Path, max_size_mb: float = 9.0, cache_dir: Optional[Path] = None
+) -> bytes:
+    """Reads the bytes of an image to send, compressing it if necessary.
+
+    Images within the size limit, the common case, are opened once and their
+    bytes are used as-is. Larger images go through check_image and its cache
+    of compressed versions.
+
+    Args:
+        image_path: Path to the original image
+        max_size_mb: Maximum allowed file size in megabytes
+        cache_dir: Directory for compressed images, as in check_image
+
+    Returns:
+        Content of the original or compressed image
+
+    Raises:
+        Exception: If image cannot be compressed below the size limit
+    """
+    with open(image_path, "rb") as image_file:
+        # Size the open file instead of stating the path separately
+        if os.fstat(image_file.fileno()).st_size <= max_size_mb * 1024 * 1024:
+            return image_file.read()
+
+    with open(check_image(image_path, max_size_mb, cache_dir), "rb") as image_file:
+        return image_file.read()
 
 
 def get_all_images(images_root: Path) -> List[Path]:
@@ -173,6 +357,30 @@ def get_all_images(images_root: Path) -> List[Path]:
     return image_files
 
 
+def get_processed_images(output_root: Path) -> Set[Tuple[str, str]]:
+    """Gets the images that already have a screening result.
+
+    Scans the output tree once instead of checking for each image's result
+    file separately, which saves one stat call per image.
+
+    Args:
+        output_root: Root directory containing book subdirectories with results
+
+    Returns:
+        Set of (book_id, image_id) pairs with a result file
+    """
+    processed = set()
+    with os.scandir(output_root) as it:
+        for entry in it:
+            if not entry.is_dir():
+                continue  # Skip if not a directory
+            # Every JSON file in a book folder is the result of one image
+            for name in list_file_names(entry.path):
+                if name.endswith(".json"):
+                    processed.add((entry.name, name[: -len(".json")]))
+    return processed
+
+
 def build_single_request(image_path: Path) -> List[Dict[str, Any]]:
     """Builds a single request for image screening API call.
 
@@ -187,13 +395,10 @@ def build_single_request(image_path: Path) -> List[Dict[str, Any]]:
     Raises:
         Exception: If encoded image exceeds 10MB size limit
     """
-    # Get the screening prompt template
-    prompt = prompt_for_image_screener()
-
-    # Encode the image for API transmission
-    base64_img = encode_image(check_image(image_path))
+    # Encode the image for API transmission, straight from the bytes read
+    base64_img = base64.b64encode(read_image(image_path))
 
-    # Calculate encoded image size
+    # Calculate encoded image size directly on the bytes
     encoded_size_mb = len(base64_img) / (1024 * 1024)
 
     # Check if encoded image exceeds API size limit
@@ -202,49 +407,91 @@ def build_single_request(image_path: Path) -> List[Dict[str, Any]]:
             f"Encoded image size {encoded_size_mb:.2f}MB exceeds 10MB limit"
         )
 
+    # Build the data URL as bytes and decode it once; base64 output is pure
+    # ASCII, which decodes faster than UTF-8
+    image_url = (DATA_URL_PREFIX + base64_img).decode("ascii")
+
     # Construct the API message with both text prompt and image
     return [
         {
             "role": "user",  # Indicate this is a user message
             "content": [
-                {"type": "text", "text": prompt},  # Text prompt for image analysis
+                {
+                    "type": "text",
+                    "text": SCREENER_PROMPT,
+                },  # Text prompt for image analysis
                 {
                     "type": "image_url",  # Image content type
-                    "image_url": {
-                        "url": f"data:image/jpeg;base64,{base64_img}"
-                    },  # Base64 encoded image
+                    "image_url": {"url": image_url},  # Base64 encoded image
                 },
             ],
         }
     ]
 
 
-def extract_json_from_response(response_text):
-    """Extract pure JSON from response that may contain Markdown code blocks.
+def prepare_request(image_path: Path) -> Dict[str, Any]:
+    """Prepares the request data for one image.
+
+    Runs in a worker process of run_screening, so it must stay a module-level
+    function that can be pickled.
+
+    Args:
+        image_path: Path to the image file to analyze
+
+    Returns:
+        Dictionary with the book ID, image ID and API messages of the image
+    """
+    return {
+        "book_id": image_path.parent.name,  # Book ID from parent directory
+        "image_id": image_path.stem,  # Image ID from filename (without extension)
+        "messages": build_single_request(image_path),  # Build API message
+    }
+
+
+def parse_json_from_response(response_text: str) -> Any:
+    """Parses the JSON content of a response that may use Markdown code blocks.
 
-    The AI model may return JSON wrapped in Markdown code blocks, so this function
-    extracts the clean JSON content.
+    The AI model usually returns bare JSON, so the whole response is parsed
+    first and the code block is only searched for when that fails.
 
     Args:
         response_text: Raw response text from the AI model
 
     Returns:
-        Clean JSON string or the original text if no JSON found
+        The parsed JSON content
+
+    Raises:
+        JSONDecodeError: If the response contains no valid JSON
     """
-    if not response_text:
-        return None
+    try:
+        return loads_json(response_text)
+    except JSONDecodeError:
+        # Use regex to extract content from code blocks (```json or ``` without language)
+        json_match = JSON_BLOCK_PATTERN.search(response_text)
+        if json_match is None:
+            raise
+        return loads_json(json_match.group(1))  # Parse the captured JSON content
 
-    # Use regex to extract content from code blocks (```json or ``` without language)
-    json_match = re.search(r"```(?:json)?\s*({.*?})\s*```", response_text, re.DOTALL)
-    if json_match:
-        return json_match.group(1)  # Return the captured JSON content
 
-    # If no code blocks found, try to parse the entire response directly
-    cleaned = response_text.strip()
-    if cleaned.startswith("{") and cleaned.endswith("}"):
-        return cleaned
+def write_result(
+    result_json: Dict[str, Any], output_root: Path, book_id: str, image_id: str
+) -> None:
+    """Saves the screening result of one image.
+
+    Creates each book's output directory only once per process instead of
+    once per image.
 
-    return response_text  # Return original if no JSON structure found
+    Args:
+        result_json: Screening result or error information to save
+        output_root: Root directory for saving results
+        book_id: Book ID of the image
+        image_id: Image ID of the image
+    """
+    output_dir = output_root / book_id
+    if output_dir not in _created_dirs:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(output_dir)
+    dump_json(result_json, output_dir / f"{image_id}.json")
 
 
 async def worker(
@@ -257,47 +504,51 @@ async def worker(
     """Worker coroutine that processes batches of image screening requests.
 
     Each worker continuously pulls batches from the queue and processes them
-    using the AI model API.
+    using the AI model API, until it receives None.
 
     Args:
         worker_id: Unique identifier for this worker
         client: AsyncArk API client for making requests
-        request_queue: Queue containing batches of requests to process
+        request_queue: Queue containing batches of requests to process, with
+            one None per worker marking the end of the work
         output_root: Root directory for saving results
         progress_bar: Progress bar to update with processing status
     """
     print(f"Worker {worker_id} started")
 
-    # Continuously process batches until queue is empty
+    # Continuously process batches until the end marker arrives
     while True:
         batch = await request_queue.get()
+        if batch is None:
+            break
         try:
-            # Process each item in the current batch
-            for item in batch:
-                try:
-                    # Make API call to screen the image
-                    response = await client.batch.chat.completions.create(
+            # Make the API calls for the whole batch at once, so a batch takes
+            # one round trip instead of one per image
+            responses = await asyncio.gather(
+                *(
+                    client.batch.chat.completions.create(
                         model="ep-bi-20250918150137-fljck",  # Specific model for image screening, default is doubao-seed-1-6-flash
                         messages=item["messages"],  # Prepared message structure
                     )
+                    for item in batch
+                ),
+                return_exceptions=True,  # Keep failures per item
+            )
 
-                    # Extract identifiers for organizing output
-                    book_id = item["book_id"]
-                    image_id = item["image_id"]
-
-                    # Create output directory structure
-                    output_dir = output_root / book_id
-                    output_dir.mkdir(parents=True, exist_ok=True)
-                    output_path = output_dir / f"{image_id}.json"
+            # Process the response of each item in the current batch
+            for item, response in zip(batch, responses):
+                try:
+                    # Handle a failed API call like any other item error
+                    if isinstance(response, Exception):
+                        raise response
 
                     # Get the response text from the API
                     result_text = response.choices[0].message.content.strip()
 
                     # Attempt to parse the response as JSON
                     try:
-                        clean_json_str = extract_json_from_response(result_text)
-                        result_json = json.loads(clean_json_str)
-                    except (json.JSONDecodeError, TypeError) as e:
+                        result_json = parse_json_from_response(result_text)
+                    except (JSONDecodeError, TypeError) as e:
                         # If parsing fails, save error information
                         result_json = {
                             "error": "Failed to parse response",
@@ -305,9 +556,15 @@ async def worker(
                             "parse_error": str(e),
                         }
 
-                    # Save the result to a JSON file
-                    with open(output_path, "w", encoding="utf-8") as f:
-                        json.dump(result_json, f, indent=2, ensure_ascii=False)
+                    # Save the result to a JSON file on a thread, so slow
+                    # storage does not block the other workers' requests
+                    await asyncio.to_thread(
+                        write_result,
+                        result_json,
+                        output_root,
+                        item["book_id"],
+                        item["image_id"],
+                    )
 
                 except Exception as e:
                     # Handle errors during individual item processing
@@ -318,21 +575,20 @@ async def worker(
 
                     # Create error result file even when processing fails
                     if "book_id" in item and "image_id" in item:
-                        book_id = item["book_id"]
-                        image_id = item["image_id"]
-                        output_dir = output_root / book_id
-                        output_dir.mkdir(parents=True, exist_ok=True)
-                        output_path = output_dir / f"{image_id}.json"
                         error_result = {"error": str(e)}
-                        with open(output_path, "w", encoding="utf-8") as f:
-                            json.dump(error_result, f, indent=2, ensure_ascii=False)
+                        await asyncio.to_thread(
+                            write_result,
+                            error_result,
+                            output_root,
+                            item["book_id"],
+                            item["image_id"],
+                        )
 
         except Exception as e:
             # Handle errors during batch processing
             print(f"[Worker {worker_id}] Batch processing error: {e}", file=sys.stderr)
         finally:
-            # Mark task as done and update progress
-            request_queue.task_done()
+            # Update progress
             progress_bar.update(len(batch))
 
 
@@ -377,36 +633,25 @@ async def run_screening(
         timeout=24 * 3600,  # 24-hour timeout for long-running requests
     )
 
-    # Create queue for managing work distribution
-    request_queue = asyncio.Queue()
+    # Create a bounded queue for managing work distribution; the producer
+    # waits when it is full, so prepared requests never pile up in memory
+    request_queue = asyncio.Queue(maxsize=worker_count * 4)
     pending_images = []  # Track images that need processing
-    request_batches = []  # Track prepared requests
 
-    # Prepare requests for each image
+    # Collect the results written by previous runs with one scan
+    processed = get_processed_images(output_root)
+
+    # Find the images that still need processing
     for image_path in all_images:
         book_id = image_path.parent.name  # Extract book ID from parent directory
         image_id = image_path.stem  # Extract image ID from filename (without extension)
-        output_path = output_root / book_id / f"{image_id}.json"
 
         # Skip images that have already been processed
-        if output_path.exists():
+        if (book_id, image_id) in processed:
             continue
 
         pending_images.append(image_path)
 
-        # Prepare request data structure
-        request_data = {
-            "book_id": book_id,
-            "image_id": image_id,
-            "messages": build_single_request(image_path),  # Build API message
-        }
-        request_batches.append(request_data)
-
-    # Create batches and add them to the queue
-    for i in range(0, len(request_batches), batch_size):
-        batch = request_batches[i : i + batch_size]
-        await request_queue.put(batch)
-
     # Check if there are any pending images to process
     if not pending_images:
         print("All images already processed.")
@@ -418,22 +663,73 @@ async def run_screening(
     # Create progress bar to track processing
     progress_bar = tqdm(total=len(pending_images), desc="Screening images", unit="img")
 
-    # Create worker tasks
-    tasks = [
+    # Decoding, compressing and encoding images is CPU-bound, so prepare the
+    # requests on a process pool while the event loop keeps the API busy
+    loop = asyncio.get_running_loop()
+    executor = ProcessPoolExecutor()
+    # Number of requests being prepared at once; bounded so memory use depends
+    # on the number of workers rather than on the number of images
+    prepare_window = (os.cpu_count() or 1) * 2
+
+    async def prepare(image_path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            return await loop.run_in_executor(executor, prepare_request, image_path)
+        except Exception as e:
+            # Images that cannot be prepared are retried on the next run
+            print(f"Error preparing {image_path}: {e}", file=sys.stderr)
+            progress_bar.update(1)
+            return None
+
+    async def produce() -> None:
+        batch = []
+        preparing = set()
+        images = iter(pending_images)
+        while True:
+            # Keep the process pool fed up to the window size
+            for image_path in images:
+                preparing.add(asyncio.ensure_future(prepare(image_path)))
+                if len(preparing) >= prepare_window:
+                    break
+            if not preparing:
+                break
+
+            # Create batches from requests in the order they become ready
+            done, preparing = await asyncio.wait(
+                preparing, return_when=asyncio.FIRST_COMPLETED
+            )
+            for future in done:
+                request_data = future.result()
+                if request_data is None:
+                    continue
+                batch.append(request_data)
+                if len(batch) == batch_size:
+                    await request_queue.put(batch)
+                    batch = []
+        if batch:
+            await request_queue.put(batch)
+
+        # Tell every worker that no more batches will come
+        for _ in range(worker_count):
+            await request_queue.put(None)
+
+    # Create worker tasks; they start calling the API as soon as the first
+    # batch is ready instead of after every image has been prepared
+    tasks = [asyncio.create_task(produce())] + [
         asyncio.create_task(worker(i, client, request_queue, output_root, progress_bar))
         for i in range(worker_count)  # Create specified number of workers
     ]
 
     try:
-        # Wait for all queue items to be processed
-        await request_queue.join()
+        # Wait for the producer and all workers to finish
+        await asyncio.gather(*tasks)
     except KeyboardInterrupt:
         print("\nInterrupted by user, cancelling tasks...")
     finally:
         # Clean up: cancel all tasks and close resources
         for task in tasks:
-            task.cancel()  # Cancel each worker task
+            task.cancel()  # Cancel each remaining task
         await asyncio.gather(*tasks, return_exceptions=True)  # Wait for cancellation
+        executor.shutdown(cancel_futures=True)
         await client.close()  # Close the API client
         progress_bar.close()  # Close the progress bar
 
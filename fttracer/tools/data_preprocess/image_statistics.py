@@ -1,16 +1,60 @@
 """Script to collect and analyze statistics from image classification and evaluation JSON files."""
 
 import os
-import json
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
+from fttracer.tools.data_preprocess.file_ops import iter_files
+from fttracer.tools.data_preprocess.json_io import load_json
 
-def collect_statistics(classification_dir, eval_dir):
+
+def _load_json_file(file_path):
+    """Load a JSON file, returning the error instead of raising it.
+
+    Args:
+        file_path: Path to the JSON file.
+
+    Returns:
+        Tuple of (data, error). data is None if loading failed.
+    """
+    try:
+        return load_json(file_path), None
+    except Exception as e:
+        return None, e
+
+
+def _iter_loaded(directory, executor):
+    """Load all JSON files under a directory on a thread pool.
+
+    Reading many small files is bound by per-file syscall latency rather than
+    bandwidth, so several reads in flight hide most of it. Results are yielded
+    in the order of the directory walk.
+
+    Args:
+        directory: Directory to search for JSON files.
+        executor: Thread pool used to read and parse the files.
+
+    Yields:
+        Tuples of (file_path, data, error) as returned by _load_json_file.
+    """
+    file_paths = list(iter_files(directory, ".json"))
+    for file_path, (data, error) in zip(
+        file_paths, executor.map(_load_json_file, file_paths)
+    ):
+        yield file_path, data, error
+
+
+def collect_statistics(classification_dir, eval_dir, max_workers=None):
     """Collect statistics from classification and evaluation JSON files.
 
+    Files are read and parsed on a thread pool; counting happens in the
+    calling thread, so the counters need no locking.
+
     Args:
         classification_dir: Path to directory containing classification JSON files.
         eval_dir: Path to directory containing evaluation JSON files.
+        max_workers: Number of threads reading files. Defaults to the
+            executor's default.
 
     Returns:
         Dictionary containing counters for different statistics categories.
@@ -24,85 +68,99 @@ def collect_statistics(classification_dir, eval_dir):
         "complexity_level": Counter(),  # Counter for complexity levels
     }
 
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
     # Process classification directory for content themes and chart types
-    # Walk through all subdirectories and files in the classification directory
-    for root, dirs, files in os.walk(classification_dir):
-        for file in files:
-            # Only process JSON files
-            if not file.endswith(".json"):
-                continue
-
-            # Construct full file path
-            file_path = os.path.join(root, file)
-
-            try:
-                # Load JSON data from classification files
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-
-                # Extract and count content themes from the JSON data
-                if "content_theme" in data:
-                    for theme in data["content_theme"]:
-                        # Convert theme to integer and increment counter
-                        theme_num = int(theme) if isinstance(theme, str) else int(theme)
-                        stats["content_theme"][theme_num] += 1
-
-                # Extract and count chart types from the JSON data
-                if "chart_type" in data:
-                    for chart in data["chart_type"]:
-                        # Convert chart type to integer and increment counter
-                        chart_num = int(chart) if isinstance(chart, str) else int(chart)
-                        stats["chart_type"][chart_num] += 1
-
-            except Exception as e:
-                # Print error message if file processing fails
-                print(f"Error processing {file_path}: {e}")
+    # Walk through all JSON files in the classification directory; os.scandir
+    # provides file types and full paths without extra stat or join calls
+    for file_path, data, error in _iter_loaded(classification_dir, executor):
+        try:
+            # Raise errors from loading JSON data from classification files
+            if error is not None:
+                raise error
+
+            # Extract and count content themes from the JSON data
+            if "content_theme" in data:
+                # Convert themes to integers and count them in one C-level update
+                stats["content_theme"].update(map(int, data["content_theme"]))
+
+            # Extract and count chart types from the JSON data
+            if "chart_type" in data:
+                # Convert chart types to integers and count them in one update
+                stats["chart_type"].update(map(int, data["chart_type"]))
+
+        except Exception as e:
+            # Print error message if file processing fails
+            print(f"Error processing {file_path}: {e}")
 
     # Process evaluation directory for compliance and complexity levels
-    # Walk through all subdirectories and files in the evaluation directory
-    for root, dirs, files in os.walk(eval_dir):
-        for file in files:
-            # Only process JSON files
-            if not file.endswith(".json"):
-                continue
-
-            # Construct full file path
-            file_path = os.path.join(root, file)
-
-            try:
-                # Load JSON data from evaluation files
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-
-                # Extract and count compliance levels from the JSON data
-                if "compliance_level" in data:
-                    compliance = data["compliance_level"]
-                    # Convert compliance level to integer and increment counter
-                    compliance_num = (
-                        int(compliance)
-                        if isinstance(compliance, str)
-                        else int(compliance)
-                    )
-                    stats["compliance_level"][compliance_num] += 1
-
-                # Extract and count complexity levels from the JSON data
-                if "complexity_level" in data:
-                    complexity = data["complexity_level"]
-                    # Convert complexity level to integer and increment counter
-                    complexity_num = (
-                        int(complexity)
-                        if isinstance(complexity, str)
-                        else int(complexity)
-                    )
-                    stats["complexity_level"][complexity_num] += 1
-
-            except Exception as e:
-                # Print error message if file processing fails
-                print(f"Error processing {file_path}: {e}")
-
+    # Walk through all JSON files in the evaluation directory; os.scandir
+    # provides file types and full paths without extra stat or join calls
+    for file_path, data, error in _iter_loaded(eval_dir, executor):
+        try:
+            # Raise errors from loading JSON data from evaluation files
+            if error is not None:
+                raise error
+
+            # Extract and count compliance levels from the JSON data
+            if "compliance_level" in data:
+                # Convert compliance level to integer and increment counter
+                stats["compliance_level"][int(data["compliance_level"])] += 1
+
+            # Extract and count complexity levels from the JSON data
+            if "complexity_level" in data:
+                # Convert complexity level to integer and increment counter
+                stats["complexity_level"][int(data["complexity_level"])] += 1
+
+        except Exception as e:
+            # Print error message if file processing fails
+            print(f"Error processing {file_path}: {e}")
+
+    executor.shutdown()
     return stats
 
 
+# Sections of the statistics report as (title, stats key, row label)
+STATISTICS_SECTIONS = (
+    ("Content Theme", "content_theme", "Theme"),
+    ("Chart Type", "chart_type", "Type"),
+    ("Compliance Level", "compliance_level", "Level"),
+    ("Complexity Level", "complexity_level", "Level"),
+)
+
+
+def format_statistics(stats, title):
+    """Format statistics as a readable report.
+
+    Args:
+        stats: Dictionary containing statistics counters.
+        title: Title line of the report.
+
+    Returns:
+        The report text, ending with a newline.
+    """
+
+    # Header for the statistics report
+    lines = ["=" * 50, title, "=" * 50]
+
+    # One section per counter with the percentage of each value
+    for index, (section, key, label) in enumerate(STATISTICS_SECTIONS, start=1):
+        lines.append(f"\n{index}. {section} ({key}) Statistics:")
+        lines.append("-" * 30)
+        total = sum(stats[key].values())
+        for value, count in sorted(stats[key].items()):
+            # Calculate percentage for each value
+            percentage = (count / total) * 100 if total > 0 else 0
+            lines.append(
+                f"   {label} {value:2d}: {count:6d} images ({percentage:5.2f}%)"
+            )
+        lines.append(f"   Total: {total} images")
+
+    lines.append("\n" + "=" * 50)
+    lines.append("Statistics completed!")
+    return "\n".join(lines) + "\n"
+
+
 def print_statistics(stats):
     """Print formatted statistics to console in a readable format.
 
@@ -110,55 +168,7 @@ def print_statistics(stats):
         stats: Dictionary containing statistics counters.
     """
 
-    # Print header for the statistics report
-    print("=" * 50)
-    print("Image Information Statistics Results")
-    print("=" * 50)
-
-    # Print content theme statistics with percentages
-    print("\n1. Content Theme (content_theme) Statistics:")
-    print("-" * 30)
-    total_content_theme = sum(stats["content_theme"].values())
-    for theme, count in sorted(stats["content_theme"].items()):
-        # Calculate percentage for each content theme
-        percentage = (
-            (count / total_content_theme) * 100 if total_content_theme > 0 else 0
-        )
-        print(f"   Theme {theme:2d}: {count:6d} images ({percentage:5.2f}%)")
-    print(f"   Total: {total_content_theme} images")
-
-    # Print chart type statistics with percentages
-    print("\n2. Chart Type (chart_type) Statistics:")
-    print("-" * 30)
-    total_chart_type = sum(stats["chart_type"].values())
-    for chart, count in sorted(stats["chart_type"].items()):
-        # Calculate percentage for each chart type
-        percentage = (count / total_chart_type) * 100 if total_chart_type > 0 else 0
-        print(f"   Type {chart:2d}: {count:6d} images ({percentage:5.2f}%)")
-    print(f"   Total: {total_chart_type} images")
-
-    # Print compliance level statistics with percentages
-    print("\n3. Compliance Level (compliance_level) Statistics:")
-    print("-" * 30)
-    total_compliance = sum(stats["compliance_level"].values())
-    for level, count in sorted(stats["compliance_level"].items()):
-        # Calculate percentage for each compliance level
-        percentage = (count / total_compliance) * 100 if total_compliance > 0 else 0
-        print(f"   Level {level:2d}: {count:6d} images ({percentage:5.2f}%)")
-    print(f"   Total: {total_compliance} images")
-
-    # Print complexity level statistics with percentages
-    print("\n4. Complexity Level (complexity_level) Statistics:")
-    print("-" * 30)
-    total_complexity = sum(stats["complexity_level"].values())
-    for level, count in sorted(stats["complexity_level"].items()):
-        # Calculate percentage for each complexity level
-        percentage = (count / total_complexity) * 100 if total_complexity > 0 else 0
-        print(f"   Level {level:2d}: {count:6d} images ({percentage:5.2f}%)")
-    print(f"   Total: {total_complexity} images")
-
-    print("\n" + "=" * 50)
-    print("Statistics completed!")
+    print(format_statistics(stats, "Image Information Statistics Results"), end="")
 
 
 def save_statistics_to_txt(stats, output_file="image_statistics_summary.txt"):
@@ -169,64 +179,21 @@ def save_statistics_to_txt(stats, output_file="image_statistics_summary.txt"):
         output_file: Path to output text file where statistics will be saved.
     """
 
+    # Write the whole report at once
+    report = format_statistics(stats, "Image Information Statistics Summary")
     with open(output_file, "w", encoding="utf-8") as f:
-        # Write header information to the output file
-        f.write("=" * 50 + "\n")
-        f.write("Image Information Statistics Summary\n")
-        f.write("=" * 50 + "\n")
-
-        # Write content theme statistics with percentages to file
-        f.write("\n1. Content Theme (content_theme) Statistics:\n")
-        f.write("-" * 30 + "\n")
-        total_content_theme = sum(stats["content_theme"].values())
-        for theme, count in sorted(stats["content_theme"].items()):
-            # Calculate percentage for each content theme
-            percentage = (
-                (count / total_content_theme) * 100 if total_content_theme > 0 else 0
-            )
-            f.write(f"   Theme {theme:2d}: {count:6d} images ({percentage:5.2f}%)\n")
-        f.write(f"   Total: {total_content_theme} images\n")
-
-        # Write chart type statistics with percentages to file
-        f.write("\n2. Chart Type (chart_type) Statistics:\n")
-        f.write("-" * 30 + "\n")
-        total_chart_type = sum(stats["chart_type"].values())
-        for chart, count in sorted(stats["chart_type"].items()):
-            # Calculate percentage for each chart type
-            percentage = (count / total_chart_type) * 100 if total_chart_type > 0 else 0
-            f.write(f"   Type {chart:2d}: {count:6d} images ({percentage:5.2f}%)\n")
-        f.write(f"   Total: {total_chart_type} images\n")
-
-        # Write compliance level statistics with percentages to file
-        f.write("\n3. Compliance Level (compliance_level) Statistics:\n")
-        f.write("-" * 30 + "\n")
-        total_compliance = sum(stats["compliance_level"].values())
-        for level, count in sorted(stats["compliance_level"].items()):
-            # Calculate percentage for each compliance level
-            percentage = (count / total_compliance) * 100 if total_compliance > 0 else 0
-            f.write(f"   Level {level:2d}: {count:6d} images ({percentage:5.2f}%)\n")
-        f.write(f"   Total: {total_compliance} images\n")
-
-        # Write complexity level statistics with percentages to file
-        f.write("\n4. Complexity Level (complexity_level) Statistics:\n")
-        f.write("-" * 30 + "\n")
-        total_complexity = sum(stats["complexity_level"].values())
-        for level, count in sorted(stats["complexity_level"].items()):
-            # Calculate percentage for each complexity level
-            percentage = (count / total_complexity) * 100 if total_complexity > 0 else 0
-            f.write(f"   Level {level:2d}: {count:6d} images ({percentage:5.2f}%)\n")
-        f.write(f"   Total: {total_complexity} images\n")
-
-        f.write("\n" + "=" * 50 + "\n")
-        f.write("Statistics completed!\n")
-
-
-def analyze_image_statistics(base_dir, output_file="image_statistics_summary.txt"):
+        f.write(report)
+
+
+def analyze_image_statistics(
+    base_dir, output_file="image_statistics_summary.txt", max_workers=None
+):
     """Main function to analyze image statistics from JSON files with configurable base directory.
 
     Args:
         base_dir: Base directory containing both classification and evaluation subdirectories
         output_file: Name of the output file to save statistics (default: image_statistics_summary.txt)
+        max_workers: Number of threads reading JSON files (default: executor's default)
     """
 
     # Construct full paths for classification and evaluation directories
@@ -250,7 +217,7 @@ def analyze_image_statistics(base_dir, output_file="image_statistics_summary.txt
     print(f"Evaluation directory: {eval_dir}")
 
     # Collect statistics from both directories
-    stats = collect_statistics(classification_dir, eval_dir)
+    stats = collect_statistics(classification_dir, eval_dir, max_workers=max_workers)
 
     # Display statistics in console for immediate viewing
     print_statistics(stats)
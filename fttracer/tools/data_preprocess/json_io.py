@@ -0,0 +1,230 @@
+"""JSON read/write helpers shared by the data preprocessing scripts.
+
+Uses ``orjson`` when it is installed and falls back to the standard library
+otherwise. ``ijson`` is optionally used to stream fields out of large files.
+Files are always read and written as bytes so the fast path can skip text
+decoding entirely.
+"""
+
+import itertools
+import json
+import mmap
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Flags for opening files to read; O_BINARY only exists (and matters) on Windows
+_READ_FLAGS = os.O_RDONLY | getattr(os, "O_BINARY", 0)
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+# catching the stdlib exception regardless of which backend is active.
+JSONDecodeError = json.JSONDecodeError
+
+# Python type names of the first ijson event of a document that is not an
+# object, so streamed files report the same type as files loaded whole
+_EVENT_TYPE_NAMES = {
+    "start_array": "list",
+    "string": "str",
+    "boolean": "bool",
+    "null": "NoneType",
+}
+
+
+def loads_json(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Parses a JSON document from bytes or text.
+
+    Args:
+        data: Raw JSON content.
+
+    Returns:
+        The decoded Python object.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode("utf-8")
+    return json.loads(data)
+
+
+def _read_fd(fd: int, size: int) -> bytes:
+    """Reads an open file descriptor to the end, expecting size bytes.
+
+    Files are read with ``os.open``/``os.read`` rather than ``open()``, which
+    skips building a buffered file object for each of the many small files
+    the preprocessing scripts read exactly once.
+    """
+    data = os.read(fd, size) if size else b""
+    if len(data) < size or not size:
+        # Short read or unknown size (e.g. pseudo files): read until EOF
+        chunks = [data]
+        while chunk := os.read(fd, 1 << 16):
+            chunks.append(chunk)
+        data = b"".join(chunks)
+    return data
+
+
+def _parse_fd(fd: int, size: int, mmap_min_size: Optional[int]) -> Any:
+    """Parses an open JSON file, mapping it when it is large enough."""
+    if mmap_min_size is not None and orjson is not None:
+        if size and size >= mmap_min_size:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+    return loads_json(_read_fd(fd, size))
+
+
+def load_json(file_path, mmap_min_size: Optional[int] = None) -> Any:
+    """Reads and parses a JSON file.
+
+    Args:
+        file_path: Path to the JSON file.
+        mmap_min_size: When set and orjson is available, files of at least this
+            many bytes are parsed straight from a read-only memory map instead
+            of being copied into a bytes object first. Small files are still
+            read normally since setting up a mapping costs more than the copy.
+
+    Returns:
+        The decoded Python object.
+    """
+    fd = os.open(file_path, _READ_FLAGS)
+    try:
+        return _parse_fd(fd, os.fstat(fd).st_size, mmap_min_size)
+    finally:
+        os.close(fd)
+
+
+def load_jsonl(file_path) -> List[Any]:
+    """Reads and parses a JSON Lines file.
+
+    Args:
+        file_path: Path to the JSONL file, holding one JSON document per line.
+
+    Returns:
+        The decoded documents in file order. Blank lines are skipped.
+    """
+    fd = os.open(file_path, _READ_FLAGS)
+    try:
+        data = _read_fd(fd, os.fstat(fd).st_size)
+    finally:
+        os.close(fd)
+    return [loads_json(line) for line in data.splitlines() if line.strip()]
+
+
+def load_json_fields(
+    file_path,
+    fields: Tuple[str, ...],
+    stream_min_size: Optional[int] = None,
+    mmap_min_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Reads selected top-level fields of a JSON object file.
+
+    Files of at least stream_min_size bytes are parsed incrementally with
+    ``ijson`` when it is installed. Parsing stops as soon as every field has
+    been seen, so the rest of a large document is never decoded. Other files
+    are loaded whole with load_json.
+
+    Args:
+        file_path: Path to the JSON file.
+        fields: Names of the top-level fields to extract.
+        stream_min_size: Minimum file size in bytes for streaming. Unset
+            disables streaming.
+        mmap_min_size: Same as in load_json, for files that are not streamed.
+
+    Returns:
+        Mapping of the requested fields that are present in the file.
+
+    Raises:
+        TypeError: If the file is not a JSON object.
+    """
+    fd = os.open(file_path, _READ_FLAGS)
+    try:
+        size = os.fstat(fd).st_size
+        if (
+            stream_min_size is not None
+            and ijson is not None
+            and size >= stream_min_size
+        ):
+            found = {}
+            with os.fdopen(fd, "rb", closefd=False) as f:
+                events = ijson.parse(f, use_float=True)
+                # Check the first event so streamed and loaded files reject
+                # the same documents
+                first = next(events)
+                if first[1] != "start_map":
+                    kind = _EVENT_TYPE_NAMES.get(first[1], first[1])
+                    raise TypeError(f"Expected a JSON object, got {kind}")
+                events = itertools.chain([first], events)
+                for key, value in ijson.kvitems(events, ""):
+                    if key in fields:
+                        found[key] = value
+                        if len(found) == len(fields):
+                            break
+            return found
+
+        data = _parse_fd(fd, size, mmap_min_size)
+    finally:
+        os.close(fd)
+    if not isinstance(data, dict):
+        raise TypeError(f"Expected a JSON object, got {type(data).__name__}")
+    return {key: data[key] for key in fields if key in data}
+
+
+def dumps_json(obj: Any, indent: bool = True) -> bytes:
+    """Serializes an object to UTF-8 encoded JSON bytes.
+
+    Non-ASCII characters are written as-is, matching ``ensure_ascii=False``.
+
+    Args:
+        obj: Object to serialize.
+        indent: Whether to pretty-print with a two-space indent.
+
+    Returns:
+        The encoded JSON document.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode(
+        "utf-8"
+    )
+
+
+def dump_json(obj: Any, file_path, indent: bool = True, atomic: bool = False) -> None:
+    """Serializes an object and writes it to a JSON file.
+
+    Args:
+        obj: Object to serialize.
+        file_path: Destination path of the JSON file.
+        indent: Whether to pretty-print with a two-space indent.
+        atomic: Write to a temporary file next to the destination and move it
+            into place with ``os.replace``, so an interrupted run never leaves
+            a truncated file at file_path.
+    """
+    data = dumps_json(obj, indent=indent)
+    if not atomic:
+        with open(file_path, "wb") as f:
+            f.write(data)
+        return
+
+    tmp_path = f"{os.fspath(file_path)}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
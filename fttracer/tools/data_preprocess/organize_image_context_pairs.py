@@ -5,10 +5,10 @@ context files into a predefined directory structure with multiple server and she
 """
 
 import os
-import shutil
-import glob
 from pathlib import Path
 
+from fttracer.tools.data_preprocess import file_distributor
+
 
 def create_directory_structure():
     """Create the target directory structure.
@@ -44,90 +44,25 @@ def get_all_image_context_pairs(images_root, context_root):
         context_root: Root directory containing context JSON files
 
     Returns:
-        List of dictionaries containing paths to matched image-context pairs
+        Tuple of the list of matched image-context pairs, the total number of
+        .jpg files and the total number of .json context files
     """
-    pairs = []
-    missing_count = 0  # Track number of missing file pairs
-
-    # Walk through all image files
-    for root, dirs, files in os.walk(images_root):
-        for file in files:
-            if file.lower().endswith(".jpg"):
-                # Build relative path
-                rel_path = os.path.relpath(root, images_root)
-                image_path = os.path.join(root, file)
-                json_file = os.path.splitext(file)[0] + ".json"
-                context_path = os.path.join(context_root, rel_path, json_file)
-
-                # Check if corresponding context file exists
-                if os.path.exists(context_path):
-                    pairs.append(
-                        {
-                            "image": image_path,
-                            "context": context_path,
-                            "rel_path": os.path.join(rel_path, file),
-                        }
-                    )
-                else:
-                    # Output information about missing files
-                    print(f"Missing context file: {image_path}")
-                    print(f"Expected context path: {context_path}")
-                    print("-" * 50)
-                    missing_count += 1
-
-    print(f"Found {len(pairs)} file pairs, missing {missing_count} pairs")
-    return pairs
+    return file_distributor.get_all_image_context_pairs(
+        images_root, context_root, ".jpg"
+    )
 
 
 def distribute_files(pairs, data_folder):
     """Distribute file pairs evenly across all data_shell folders.
 
+    Uses the threaded copy of file_distributor with this script's fixed layout
+    of 25 servers with 20 shells each.
+
     Args:
         pairs: List of image-context file pairs to distribute
         data_folder: Root directory of the target structure
     """
-    total_shells = 25 * 20  # 25 servers × 20 shells = 500 target folders
-    print(f"Distributing {len(pairs)} file pairs across {total_shells} folders")
-
-    # Calculate approximate number of files per shell
-    files_per_shell = len(pairs) // total_shells
-    remainder = len(pairs) % total_shells
-    print(
-        f"Approximately {files_per_shell} files per shell, with {remainder} extra files"
-    )
-
-    # Distribute files
-    for idx, pair in enumerate(pairs):
-        # Calculate target shell for this file pair
-        shell_idx = idx % total_shells
-        server_num = shell_idx // 20 + 1
-        shell_num = shell_idx % 20 + 1
-
-        server_name = f"data_server_{server_num:03d}"
-        shell_name = f"data_shell_{shell_num:03d}"
-
-        # Target paths
-        target_base = Path(data_folder) / server_name / shell_name
-
-        # Copy image file
-        target_image_dir = target_base / "images"
-        rel_dir = os.path.dirname(pair["rel_path"])
-        (target_image_dir / rel_dir).mkdir(parents=True, exist_ok=True)
-        target_image_path = target_image_dir / pair["rel_path"]
-        shutil.copy2(pair["image"], target_image_path)
-
-        # Copy context file
-        target_context_dir = target_base / "context"
-        (target_context_dir / rel_dir).mkdir(parents=True, exist_ok=True)
-        context_filename = (
-            os.path.splitext(os.path.basename(pair["rel_path"]))[0] + ".json"
-        )
-        target_context_path = target_context_dir / rel_dir / context_filename
-        shutil.copy2(pair["context"], target_context_path)
-
-        # Progress indicator
-        if (idx + 1) % 1000 == 0:
-            print(f"Processed {idx + 1} file pairs")
+    file_distributor.distribute_files(pairs, data_folder)
 
 
 def main():
@@ -136,16 +71,6 @@ def main():
     images_root = r"E:\fttracer\4_sampled_data\selected_images_folder"
     context_root = r"E:\fttracer\4_sampled_data\context_summary_202509141749"
 
-    # Count total image files
-    image_files = list(glob.glob(os.path.join(images_root, "**/*.jpg"), recursive=True))
-    print("Total .jpg files:", len(image_files))
-
-    # Count total context files
-    context_files = list(
-        glob.glob(os.path.join(context_root, "**/*.json"), recursive=True)
-    )
-    print("Total .json files:", len(context_files))
-
     # Verify source paths exist
     if not os.path.exists(images_root):
         print(f"Error: Image path does not exist - {images_root}")
@@ -158,7 +83,13 @@ def main():
     create_directory_structure()
 
     print("Collecting file pairs...")
-    pairs = get_all_image_context_pairs(images_root, context_root)
+    pairs, image_count, context_count = get_all_image_context_pairs(
+        images_root, context_root
+    )
+
+    # Report the totals counted while collecting the pairs
+    print("Total .jpg files:", image_count)
+    print("Total .json files:", context_count)
     print(f"Found {len(pairs)} valid image-context file pairs")
 
     if len(pairs) == 0:
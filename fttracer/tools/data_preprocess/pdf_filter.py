@@ -20,15 +20,50 @@ Environment:
 """
 
 import os
-import glob
-import json
+import re
+import errno
 import time
+import hashlib
 import shutil
-import http.client
-from typing import List, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set, Tuple
 
+import requests
+from requests.adapters import HTTPAdapter
+
+from fttracer.tools.data_preprocess.json_io import dump_json, load_json
 from fttracer.tools.data_preprocess.prompt import prompt_for_pdf_filter
 
+# Title keywords that settle a classification without calling the API. They
+# follow the rules of the default prompt, and KEEP is checked first so that
+# e.g. "艾略特波浪理论实战" stays KEEP despite containing "理论". English
+# keywords only match whole words ("Chartered" is not "chart"); letters are
+# the word boundary rather than \b, so "Chart_Patterns" and "图表Chart" match.
+KEEP_TITLE_PATTERN = re.compile(
+    r"技术分析|技术指标|形态|图表|图解|看盘|趋势跟踪|k线|蜡烛图|均线|短线|波浪"
+    r"|(?<![a-z])(?:technical analysis|charts?|charting|candlesticks?|k-line"
+    r"|patterns?|illustrated|elliott wave|moving averages?)(?![a-z])",
+    re.IGNORECASE,
+)
+DELETE_TITLE_PATTERN = re.compile(
+    r"传记|理财|管理|论坛|创业|销售|历史|哲学|金融理论"
+    r"|(?<![a-z])(?:biography|biographies|biographical|memoirs?|management"
+    r"|philosophy|history|principles|theory|theories)(?![a-z])",
+    re.IGNORECASE,
+)
+
+# Text generation endpoint of the DashScope API
+QWEN_API_URL = (
+    "https://dashscope.aliyuncs.com/api/v1/services/aigc/text-generation/generation"
+)
+
+# Session shared by all classification calls; it keeps TLS connections alive
+# so each call skips the TCP and TLS handshakes. Its pool holds enough
+# connections for the classification threads to use one each.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=32))
+
 
 def _create_directories(base_path: str) -> None:
     """
@@ -65,40 +100,46 @@ def _get_files_to_delete_initial(
             - List of file paths to delete immediately
             - List of valid PDFs above size threshold for further processing
     """
-    # Get all files in the specified folder using glob pattern matching
-    all_files = glob.glob(os.path.join(folder_path, "*"))
-
     # Initialize lists to store files that need different actions
     files_to_delete = []  # Files that fail initial screening criteria
     files_to_process = []  # Files that pass initial screening for further analysis
 
-    # Process each file in the directory
-    for file_path in all_files:
-        # Skip directories - we only want to process actual files
-        if os.path.isdir(file_path):
-            continue
-
-        # Extract the filename from the full path for extension checking
-        file_name = os.path.basename(file_path)
-
-        try:
-            # Check if file size is below the threshold (too small to be useful)
-            if os.path.getsize(file_path) < size_threshold:
-                files_to_delete.append(file_path)  # Mark for immediate deletion
-                continue  # Skip to next file
-        except OSError as e:
-            # Handle case where file access fails (permissions, corrupted, etc.)
-            print(f"Cannot access file size for {file_path}: {e}")
-            files_to_delete.append(file_path)  # Mark for deletion due to access issues
-            continue
-
-        # Check if file has PDF extension (case-insensitive comparison)
-        if not file_name.lower().endswith(".pdf"):
-            files_to_delete.append(file_path)  # Mark non-PDF files for deletion
-            continue
-
-        # If file passes all initial checks, add to processing list
-        files_to_process.append(file_path)
+    # Process each entry in the folder; os.scandir returns names and file types
+    # from the directory listing, so only the size check needs a stat call
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            # Skip hidden files, which the glob pattern "*" never matched
+            if entry.name.startswith("."):
+                continue
+
+            # Extract the filename from the full path for extension checking
+            file_path = entry.path
+            file_name = entry.name
+
+            try:
+                # Skip directories - we only want to process actual files
+                if entry.is_dir():
+                    continue
+
+                # Check if file size is below the threshold (too small to be useful)
+                if entry.stat().st_size < size_threshold:
+                    files_to_delete.append(file_path)  # Mark for immediate deletion
+                    continue  # Skip to next file
+            except OSError as e:
+                # Handle case where file access fails (permissions, corrupted, etc.)
+                print(f"Cannot access file size for {file_path}: {e}")
+                files_to_delete.append(
+                    file_path
+                )  # Mark for deletion due to access issues
+                continue
+
+            # Check if file has PDF extension (case-insensitive comparison)
+            if not file_name.lower().endswith(".pdf"):
+                files_to_delete.append(file_path)  # Mark non-PDF files for deletion
+                continue
+
+            # If file passes all initial checks, add to processing list
+            files_to_process.append(file_path)
 
     # Return both lists: files to delete immediately and files for further processing
     return files_to_delete, files_to_process
@@ -128,9 +169,6 @@ def _call_qwen_api(
         str: One of 'keep', 'delete', or 'uncertain'
     """
     try:
-        # Establish HTTPS connection to DashScope API endpoint
-        conn = http.client.HTTPSConnection("dashscope.aliyuncs.com")
-
         # Retrieve the API key from environment variables for authentication
         API_KEY = os.getenv("DASHSCOPE_API_KEY")
         if not API_KEY:
@@ -164,18 +202,15 @@ def _call_qwen_api(
             "Content-Type": "application/json",  # Specify JSON payload format
         }
 
-        # Send POST request to the text generation endpoint
-        conn.request(
-            "POST",
-            "/api/v1/services/aigc/text-generation/generation",  # API endpoint for text generation
-            json.dumps(payload),  # Convert Python object to JSON string
-            headers,
+        # Send POST request to the text generation endpoint over a pooled
+        # keep-alive connection
+        res = _SESSION.post(
+            QWEN_API_URL,
+            json=payload,  # Serialize the payload as the JSON request body
+            headers=headers,
+            timeout=30,
         )
-
-        # Get and process the API response
-        res = conn.getresponse()  # Retrieve HTTP response object
-        data = res.read()  # Read the response body
-        response = json.loads(data.decode("utf-8"))  # Parse JSON response
+        response = res.json()  # Parse JSON response
 
         # Check if the response contains expected structure and extract classification
         if "output" in response and "text" in response["output"]:
@@ -197,57 +232,165 @@ def _call_qwen_api(
         # Handle any API call failures gracefully
         print(f"API call failed for '{book_title}': {e}")
         return "uncertain"  # Default to uncertain on failure
-    finally:
-        # Ensure connection is properly closed to prevent resource leaks
-        conn.close()
 
 
-def _move_files(files: List[str], destination_folder: str, base_folder: str) -> int:
+def _move_file(file_path: str, dest_path: str, existing_names: Set[str]) -> bool:
     """
-    Move a list of files to a destination subfolder, handling name conflicts.
+    Move a file into a destination directory, handling name conflicts.
 
     If a file with the same name exists, appends a counter (e.g., file_1.pdf).
+    Conflicts are found in existing_names, the names already taken in
+    dest_path, instead of with one stat call per candidate name.
 
     Args:
-        files (List[str]): List of source file paths.
-        destination_folder (str): Name of subfolder (e.g., "to_keep").
-        base_folder (str): Parent directory containing destination subfolder.
+        file_path (str): Source file path.
+        dest_path (str): Destination directory.
+        existing_names (Set[str]): Names taken in dest_path; the chosen name is
+            added after a successful move.
 
     Returns:
-        int: Number of successfully moved files.
+        bool: True if the file was moved.
     """
-    # Initialize counter to track successfully moved files
-    moved_count = 0
-    # Construct full path to destination directory
-    dest_path = os.path.join(base_folder, destination_folder)
+    try:
+        # Extract just the filename from the full path
+        file_name = os.path.basename(file_path)
 
-    # Process each file in the list
-    for file_path in files:
-        try:
-            # Extract just the filename from the full path
-            file_name = os.path.basename(file_path)
-            # Construct destination file path
-            dest_file_path = os.path.join(dest_path, file_name)
-
-            # Handle potential filename conflicts by adding counter suffix
-            counter = 1
-            original_name = file_name  # Store original name for reference
-            while os.path.exists(dest_file_path):
-                # Split filename and extension to insert counter between them
-                name, ext = os.path.splitext(original_name)
+        # Handle potential filename conflicts by adding counter suffix
+        counter = 1
+        dest_name = file_name
+        if dest_name in existing_names:
+            # Split filename and extension to insert counter between them
+            name, ext = os.path.splitext(file_name)
+            while dest_name in existing_names:
                 # Create new filename with counter suffix
-                dest_file_path = os.path.join(dest_path, f"{name}_{counter}{ext}")
+                dest_name = f"{name}_{counter}{ext}"
                 counter += 1  # Increment counter for next potential conflict
+        # Construct destination file path
+        dest_file_path = os.path.join(dest_path, dest_name)
 
-            # Actually move the file from source to destination
+        # Actually move the file from source to destination; on the same
+        # filesystem this is a single rename, otherwise copy and delete
+        try:
+            os.replace(file_path, dest_file_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
             shutil.move(file_path, dest_file_path)
-            moved_count += 1  # Increment successful move counter
+        existing_names.add(dest_name)  # The name is taken from now on
+        return True
+    except Exception as e:
+        # Log any errors that occur during file moving
+        print(f"Failed to move {file_path}: {e}")
+        return False
+
+
+class _ClassificationCache:
+    """On-disk cache of book classifications keyed by a hash of the title.
+
+    Keys also cover the model and the prompt, so changing either starts from
+    an empty cache. Only 'keep' and 'delete' are cached, since 'uncertain' is
+    also what a failed API call returns.
+    """
+
+    # Number of new entries after which the cache is written to disk
+    FLUSH_EVERY = 100
+
+    def __init__(self, cache_path: str, model_name: str, prompt: str):
+        """
+        Args:
+            cache_path (str): Path of the cache file.
+            model_name (str): Qwen model the classifications come from.
+            prompt (str): System prompt the classifications come from.
+        """
+        self.cache_path = cache_path
+        self._key_prefix = f"{model_name}\0{prompt}\0".encode("utf-8")
+        self._entries = {}
+        self._unsaved = 0
+        self.hits = 0
+
+        try:
+            self._entries = load_json(cache_path)
+        except FileNotFoundError:
+            pass
         except Exception as e:
-            # Log any errors that occur during file moving
-            print(f"Failed to move {file_path}: {e}")
+            print(f"Ignoring unreadable classification cache {cache_path}: {e}")
+
+    def _key(self, title: str) -> str:
+        """Hash the normalized title together with the model and prompt."""
+        normalized = title.strip().lower().encode("utf-8")
+        return hashlib.blake2b(
+            self._key_prefix + normalized, digest_size=16
+        ).hexdigest()
+
+    def get(self, title: str):
+        """Return the cached classification of a title, or None on a miss."""
+        result = self._entries.get(self._key(title))
+        if result is not None:
+            self.hits += 1
+        return result
+
+    def put(self, title: str, result: str) -> None:
+        """Store the classification of a title, flushing every FLUSH_EVERY entries."""
+        if result not in ("keep", "delete"):
+            return
+        key = self._key(title)
+        if self._entries.get(key) == result:
+            return
+        self._entries[key] = result
+        self._unsaved += 1
+        if self._unsaved >= self.FLUSH_EVERY:
+            self.save()
+
+    def save(self) -> None:
+        """Write the cache file if it has unsaved entries."""
+        if not self._unsaved:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        dump_json(self._entries, self.cache_path, indent=False, atomic=True)
+        self._unsaved = 0
+
+
+def _classify_by_keywords(book_title: str):
+    """
+    Classify a book from title keywords alone.
+
+    Args:
+        book_title (str): Title of the book.
+
+    Returns:
+        'keep' or 'delete' if a keyword rule matches, otherwise None.
+    """
+    if KEEP_TITLE_PATTERN.search(book_title):
+        return "keep"
+    if DELETE_TITLE_PATTERN.search(book_title):
+        return "delete"
+    return None
+
+
+def _book_title(file_path: str) -> str:
+    """Extract the book title from a file path (file name without extension)."""
+    return os.path.splitext(os.path.basename(file_path))[0]
 
-    # Return total count of successfully moved files
-    return moved_count
+
+class _RateLimiter:
+    """Spaces out the start of API calls made from several threads."""
+
+    def __init__(self, interval: float):
+        """
+        Args:
+            interval (float): Minimum number of seconds between two call starts.
+        """
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_start = 0.0  # Earliest time the next call may start
+
+    def wait(self) -> None:
+        """Block until the calling thread may start its API call."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        time.sleep(start - now)
 
 
 def _process_books_with_qwen(
@@ -258,10 +401,20 @@ def _process_books_with_qwen(
     temperature: float = 0.3,
     max_tokens: int = 10,
     delay_between_calls: float = 1.0,
+    max_workers: int = 8,
+    use_cache: bool = True,
+    use_keyword_rules: bool = True,
 ) -> None:
     """
     Classify each book using the Qwen API and move to appropriate folders.
 
+    Requests run on a thread pool so their latencies overlap, while the rate
+    limiter keeps the request rate at one call per delay_between_calls.
+    Titles matching an obvious keyword rule, and titles classified in earlier
+    runs (cached in base_folder/.cache), are settled without calling the API.
+    Each book is moved as soon as its classification is known, while the
+    remaining requests are still in flight.
+
     Args:
         files_to_process (List[str]): List of PDF file paths to classify.
         base_folder (str): Root directory for output subfolders.
@@ -269,23 +422,59 @@ def _process_books_with_qwen(
         model_name (str): Qwen model name.
         temperature (float): LLM sampling temperature.
         max_tokens (int): Max tokens in LLM response.
-        delay_between_calls (float): Seconds to wait between API calls (rate limiting).
+        delay_between_calls (float): Minimum seconds between the starts of two API calls (rate limiting).
+        max_workers (int): Maximum number of API calls in flight at once.
+        use_cache (bool): Reuse classifications of titles seen in earlier runs.
+        use_keyword_rules (bool): Settle titles matching KEEP_TITLE_PATTERN or
+            DELETE_TITLE_PATTERN locally. Disable when using a custom prompt
+            with different rules.
     """
     # Print status message to indicate start of classification process
     print(f"Processing {len(files_to_process)} books with Qwen classification...")
 
-    # Initialize lists to store files based on their classification results
-    qwen_to_delete = []  # Files classified as not containing visual content
-    qwen_to_keep = []  # Files classified as containing valuable visual content
-    qwen_uncertain = []  # Files with ambiguous classification results
+    # Destination folder of each classification result, with the names
+    # already taken in it, listed once
+    destinations = {
+        "delete": "to_delete",  # Files classified as not containing visual content
+        "keep": "to_keep",  # Files classified as containing valuable visual content
+        "uncertain": "uncertain",  # Files with ambiguous classification results
+    }
+    existing_by_dest = {
+        folder: set(os.listdir(os.path.join(base_folder, folder)))
+        for folder in destinations.values()
+    }
+    moved_counts = dict.fromkeys(destinations.values(), 0)
+
+    # Shared by all threads to respect the provider's rate limit
+    rate_limiter = _RateLimiter(delay_between_calls)
+
+    cache = None
+    if use_cache:
+        cache = _ClassificationCache(
+            os.path.join(base_folder, ".cache", "qwen_classification.cache"),
+            model_name,
+            prior_knowledge_prompt,
+        )
 
-    # Process each file through the Qwen API classification
-    for i, file_path in enumerate(files_to_process):
+    def classify(file_path: str) -> Tuple[str, bool]:
+        """Return the classification of a book and whether the API produced it."""
         # Extract book title from filename (remove extension)
-        file_name = os.path.basename(file_path)
-        title = os.path.splitext(file_name)[0]
-
-        # Call the Qwen API to classify the current book based on its title
+        title = _book_title(file_path)
+
+        # Settle titles with obvious keywords locally
+        if use_keyword_rules:
+            keyword_result = _classify_by_keywords(title)
+            if keyword_result is not None:
+                return keyword_result, False
+
+        # Skip the API call for titles classified in an earlier run
+        if cache is not None:
+            cached_result = cache.get(title)
+            if cached_result is not None:
+                return cached_result, False
+
+        # Wait for a free slot, then call the Qwen API to classify the book
+        rate_limiter.wait()
         result = _call_qwen_api(
             book_title=title,
             prior_knowledge_prompt=prior_knowledge_prompt,
@@ -293,29 +482,38 @@ def _process_books_with_qwen(
             temperature=temperature,
             max_tokens=max_tokens,
         )
-
-        # Categorize the file based on API classification result
-        if result == "keep":
-            qwen_to_keep.append(file_path)  # Add to keep list
-        elif result == "delete":
-            qwen_to_delete.append(file_path)  # Add to delete list
-        else:
-            qwen_uncertain.append(file_path)  # Add to uncertain list
-
-        # Implement rate limiting by adding delay between API calls (except for last file)
-        if i < len(files_to_process) - 1:  # No delay after processing the last file
-            time.sleep(delay_between_calls)
-
-    # Move all classified files to their respective destination folders
-    deleted_count = _move_files(qwen_to_delete, "to_delete", base_folder)
-    kept_count = _move_files(qwen_to_keep, "to_keep", base_folder)
-    uncertain_count = _move_files(qwen_uncertain, "uncertain", base_folder)
+        return result, True
+
+    # Process the files through the Qwen API classification concurrently;
+    # map returns the results in the order of files_to_process
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for file_path, (result, from_api) in zip(
+            files_to_process, executor.map(classify, files_to_process)
+        ):
+            # Remember API classifications for later runs; keyword results
+            # are not cached so that disabling the rules takes effect
+            if cache is not None and from_api:
+                cache.put(_book_title(file_path), result)
+
+            # Move the file as soon as its result is known, while the
+            # remaining classifications are still in flight
+            folder = destinations.get(result, "uncertain")
+            if _move_file(
+                file_path,
+                os.path.join(base_folder, folder),
+                existing_by_dest[folder],
+            ):
+                moved_counts[folder] += 1
+
+    if cache is not None:
+        cache.save()
+        print(f"Reused {cache.hits} cached classifications")
 
     # Print summary of classification results
     print(f"\nClassification Results:")
-    print(f"Moved to 'to_delete': {deleted_count} files")
-    print(f"Moved to 'to_keep': {kept_count} files")
-    print(f"Moved to 'uncertain': {uncertain_count} files")
+    print(f"Moved to 'to_delete': {moved_counts['to_delete']} files")
+    print(f"Moved to 'to_keep': {moved_counts['to_keep']} files")
+    print(f"Moved to 'uncertain': {moved_counts['uncertain']} files")
 
 
 def process_books(
@@ -327,6 +525,9 @@ def process_books(
     temperature: float = 0.3,
     max_tokens: int = 10,
     delay_between_calls: float = 1.0,
+    max_workers: int = 8,
+    use_cache: bool = True,
+    use_keyword_rules: bool = True,
 ) -> None:
     """
     Main orchestration function for PDF classification pipeline.
@@ -348,6 +549,9 @@ def process_books(
         temperature (float): LLM temperature.
         max_tokens (int): Max tokens in response.
         delay_between_calls (float): Delay between API calls in seconds.
+        max_workers (int): Maximum number of API calls in flight at once.
+        use_cache (bool): Reuse classifications of titles seen in earlier runs.
+        use_keyword_rules (bool): Classify titles with obvious keywords without the API.
     """
     # Validate that the input directory exists before proceeding
     if not os.path.exists(input_dir):
@@ -454,6 +658,9 @@ Respond with EXACTLY ONE WORD: 'KEEP', 'DELETE', or 'UNCERTAIN'
         temperature=temperature,
         max_tokens=max_tokens,
         delay_between_calls=delay_between_calls,
+        max_workers=max_workers,
+        use_cache=use_cache,
+        use_keyword_rules=use_keyword_rules,
     )
 
     # Print completion message
@@ -500,6 +707,9 @@ def filter_pdfs(
     temperature: float = 0.3,
     max_tokens: int = 10,
     delay_between_calls: float = 1.0,
+    max_workers: int = 8,
+    use_cache: bool = True,
+    use_keyword_rules: bool = True,
 ) -> None:
     """
     Public API for PDF classification. Validates inputs and starts processing.
@@ -514,6 +724,9 @@ def filter_pdfs(
         temperature (float): LLM temperature.
         max_tokens (int): Max tokens in LLM response.
         delay_between_calls (float): Delay between API calls (seconds).
+        max_workers (int): Maximum number of API calls in flight at once.
+        use_cache (bool): Reuse classifications of titles seen in earlier runs.
+        use_keyword_rules (bool): Classify titles with obvious keywords without the API.
 
     Raises:
         FileNotFoundError: If input_dir does not exist or prompt file is not found.
@@ -541,6 +754,9 @@ def filter_pdfs(
         temperature=temperature,
         max_tokens=max_tokens,
         delay_between_calls=delay_between_calls,
+        max_workers=max_workers,
+        use_cache=use_cache,
+        use_keyword_rules=use_keyword_rules,
     )
 
 
@@ -0,0 +1,168 @@
+"""On-disk cache of model responses for screened images.
+
+Screening an image costs an API request, so responses are kept in a SQLite
+database keyed by a hash of the image content, the model and the prompt.
+Changing the model or the prompt therefore starts from an empty cache. The
+content hash of every image path is remembered, so an image whose path, size
+and mtime are unchanged is served without being read at all; otherwise its
+content is hashed, so a renamed, moved or re-exported but byte-identical image
+still hits the cache. This lets deleted or regenerated outputs be rebuilt
+without calling the API again.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional, Tuple
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Bytes read per chunk when hashing image files
+HASH_CHUNK_SIZE = 1 << 20
+
+# Bumped whenever the tables change; older databases are rebuilt
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS paths (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS responses (
+    key BLOB PRIMARY KEY,
+    response TEXT NOT NULL
+);
+"""
+
+
+def hash_file(file_path: str) -> bytes:
+    """Hashes the content of a file.
+
+    Uses xxHash when ``xxhash`` is installed and BLAKE2b from the standard
+    library otherwise. Digests of the two differ, so switching backends only
+    invalidates content matches, not path matches.
+
+    Args:
+        file_path: Path to the file.
+
+    Returns:
+        Digest of the file content.
+    """
+    hasher = xxhash.xxh3_128() if xxhash is not None else hashlib.blake2b()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            hasher.update(chunk)
+    return hasher.digest()
+
+
+class ScreenerCache:
+    """SQLite cache of model responses keyed by image content, model and prompt.
+
+    The cache is safe to share between the worker threads of screen_image.
+    """
+
+    def __init__(self, db_path: str, model_name: str, prompt_text: str):
+        """Opens the cache database, creating it if needed.
+
+        Args:
+            db_path: Path of the SQLite database file.
+            model_name: Model the cached responses come from.
+            prompt_text: Prompt the cached responses come from.
+        """
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            # Entries of older layouts do not record the model and prompt
+            self._conn.executescript(
+                "DROP TABLE IF EXISTS paths; DROP TABLE IF EXISTS responses;"
+            )
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+        self._key_prefix = f"{model_name}\0{prompt_text}\0".encode("utf-8")
+        self._lock = threading.Lock()
+        # Key and file state of each image looked up with get(), reused by put()
+        self._keys: Dict[str, Tuple[bytes, bytes, int, int]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, digest: bytes) -> bytes:
+        """Combines an image content hash with the model and prompt."""
+        return hashlib.blake2b(self._key_prefix + digest, digest_size=16).digest()
+
+    def get(self, image_path: str) -> Tuple[bool, Optional[str]]:
+        """Looks up the cached response for an image.
+
+        Args:
+            image_path: Path of the image file.
+
+        Returns:
+            Tuple of (hit, response). response is None on a miss.
+        """
+        image_path = os.path.abspath(image_path)
+        st = os.stat(image_path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT hash FROM paths WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (image_path, st.st_size, st.st_mtime_ns),
+            ).fetchone()
+        if row is not None:
+            # Unchanged since it was last hashed: no need to read the file
+            digest = row[0]
+        else:
+            # Changed or unknown path: hash the content and remember it
+            digest = hash_file(image_path)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO paths VALUES (?, ?, ?, ?)",
+                    (image_path, st.st_size, st.st_mtime_ns, digest),
+                )
+                self._conn.commit()
+
+        key = self._key(digest)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._keys[image_path] = (key, digest, st.st_size, st.st_mtime_ns)
+                self.misses += 1
+                return False, None
+            self.hits += 1
+        return True, row[0]
+
+    def put(self, image_path: str, response: str) -> None:
+        """Stores the response for an image looked up with get().
+
+        Args:
+            image_path: Path of the image file.
+            response: Raw response content returned by the model.
+        """
+        image_path = os.path.abspath(image_path)
+        with self._lock:
+            entry = self._keys.pop(image_path, None)
+        if entry is None:
+            st = os.stat(image_path)
+            digest = hash_file(image_path)
+            entry = (self._key(digest), digest, st.st_size, st.st_mtime_ns)
+        key, digest, size, mtime_ns = entry
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO paths VALUES (?, ?, ?, ?)",
+                (image_path, size, mtime_ns, digest),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?)", (key, response)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self._conn.close()